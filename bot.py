@@ -5,33 +5,62 @@ from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
-from aiogram.types import (
-    BotCommand,
-    BotCommandScopeAllGroupChats,
-    BotCommandScopeAllPrivateChats,
-)
 from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiogram_dialog import setup_dialogs
 from aiohttp import web
 from aiohttp.web import Response
+from redis.asyncio import Redis
 from stp_database import create_engine, create_session_pool
 
-from tgbot.config import Config, load_config
+from tgbot.config import Config, setup_config
+from tgbot.database import (
+    QuestionerRepo,
+    cache_stats,
+    ensure_counters,
+    setup_counters,
+    setup_questions_sync,
+    setup_settings_sync,
+)
+from tgbot.database.instrumentation import instrument_engine
 from tgbot.dialogs.menus import dialogs_list
 from tgbot.handlers import routers_list
 from tgbot.middlewares.AccessMiddleware import AccessMiddleware
 from tgbot.middlewares.ConfigMiddleware import ConfigMiddleware
 from tgbot.middlewares.DatabaseMiddleware import DatabaseMiddleware
 from tgbot.middlewares.MessagePairingMiddleware import MessagePairingMiddleware
+from tgbot.middlewares.MetricsMiddleware import (
+    HandlerMetricsMiddleware,
+    TelegramMetricsMiddleware,
+    UpdateMetricsMiddleware,
+)
+from tgbot.middlewares.QueryCounterMiddleware import QueryCounterMiddleware
 from tgbot.middlewares.UsersMiddleware import UsersMiddleware
+from tgbot.services.bot_setup import (
+    ALLOWED_UPDATES,
+    remove_webhook,
+    setup_bot_commands,
+    setup_webhook,
+)
+from tgbot.services.export_cache import setup_export_cache
 from tgbot.services.logger import setup_logging
+from tgbot.services.metrics import metrics_handler, register_stats
+from tgbot.services.request_scheduler import RequestSchedulerMiddleware
 from tgbot.services.scheduler import (
+    ATTENTION_REMINDERS_JOB_ID,
+    flush_deletion_queue,
+    flush_username_updates_job,
+    log_cache_stats,
+    log_request_stats,
+    log_update_stats,
     register_scheduler_dependencies,
     remove_old_topics,
     scheduler,
+    send_attention_reminders,
+    setup_scheduler,
+    sweep_inactive_questions,
 )
-
-bot_config = load_config(".env")
+from tgbot.services.stats_export import shutdown_export_workers
+from tgbot.services.update_executor import UpdateExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -63,43 +92,6 @@ logger = logging.getLogger(__name__)
 #     )
 
 
-async def on_startup_webhook(bot: Bot, config: Config) -> None:
-    """Настройка webhook при запуске бота.
-
-    Args:
-        bot: Экземпляр бота
-        config: Конфигурация приложения
-    """
-    webhook_url = f"https://{config.tg_bot.webhook_domain}{config.tg_bot.webhook_path}"
-    logger.info(f"[Вебхук] Устанавливаем вебхук: {webhook_url}")
-
-    await bot.set_webhook(
-        url=webhook_url,
-        allowed_updates=[
-            "message",
-            "callback_query",
-            "inline_query",
-            "my_chat_member",
-            "chat_member",
-            "chat_join_request",
-        ],
-        drop_pending_updates=True,
-        secret_token=config.tg_bot.webhook_secret,
-    )
-    logger.info("[Вебхук] Вебхук установлен")
-
-
-async def on_shutdown_webhook(bot: Bot) -> None:
-    """Удаление webhook при остановке бота.
-
-    Args:
-        bot: Экземпляр бота
-    """
-    logger.info("[Вебхук] Удаляем вебхук...")
-    await bot.delete_webhook()
-    logger.info("[Вебхук] Вебхук удален")
-
-
 async def health_check(_request) -> Response:
     """Эндпоинт для проверки здоровья приложения.
 
@@ -170,6 +162,10 @@ def get_storage(config):
 async def main():
     setup_logging()
 
+    # Конфиг читается один раз, остальные модули получают его через get_config()
+    bot_config = setup_config()
+    setup_scheduler(bot_config)
+
     storage = get_storage(bot_config)
 
     bot = Bot(
@@ -177,24 +173,10 @@ async def main():
         default=DefaultBotProperties(parse_mode="HTML", link_preview_is_disabled=True),
     )
 
-    # Определение команд для приватных чатов
-    await bot.set_my_commands(
-        commands=[
-            BotCommand(command="start", description="Главное меню"),
-            BotCommand(command="end", description="Закрыть вопрос"),
-        ],
-        scope=BotCommandScopeAllPrivateChats(),
-    )
-
-    # Определение команд для групповых чатов
-    await bot.set_my_commands(
-        commands=[
-            BotCommand(command="settings", description="Настройки форума"),
-            BotCommand(command="release", description="Освободить вопрос"),
-            BotCommand(command="end", description="Закрыть вопрос"),
-        ],
-        scope=BotCommandScopeAllGroupChats(),
-    )
+    # Ограничение частоты и приоритизация исходящих запросов
+    request_scheduler = RequestSchedulerMiddleware()
+    bot.session.middleware(request_scheduler)
+    bot.session.middleware(TelegramMetricsMiddleware())
 
     dp = Dispatcher(storage=storage)
 
@@ -213,6 +195,8 @@ async def main():
         db_name=bot_config.db.questioner_db,
     )
 
+    instrument_engine(stp_engine, "stp")
+    instrument_engine(questioner_engine, "questioner")
     main_db = create_session_pool(stp_engine)
     questioner_db = create_session_pool(questioner_engine)
 
@@ -224,10 +208,60 @@ async def main():
     dp.include_routers(*dialogs_list)
     # dp.include_routers(*common_dialogs_list)
     setup_dialogs(dp)
+    HandlerMetricsMiddleware().setup(dp)
+
+    # Параллельная обработка разных чатов с сохранением порядка внутри чата
+    update_executor = UpdateExecutor(
+        max_concurrent=bot_config.tg_bot.max_concurrent_updates
+    )
+    update_executor.setup(dp)
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+
+    # Подсчет SQL-запросов на апдейт для поиска N+1, только для отладки
+    if bot_config.debug.sql_debug:
+        dp.update.outer_middleware(
+            QueryCounterMiddleware(
+                max_queries=bot_config.debug.sql_max_queries,
+                repeat_threshold=bot_config.debug.sql_repeat_threshold,
+            )
+        )
+
+    register_stats(
+        "questioner_cache", "Статистика кешей репозиториев", cache_stats, "cache"
+    )
+    register_stats(
+        "questioner_request_queue",
+        "Очередь исходящих запросов к Telegram",
+        request_scheduler.stats,
+    )
+    register_stats(
+        "questioner_update_executor", "Обработка апдейтов", update_executor.stats
+    )
 
     register_middlewares(dp, bot_config, bot, main_db, questioner_db)
 
-    register_scheduler_dependencies(bot, questioner_db, main_db)
+    # Синхронизация кешей настроек форумов и вопросов между репликами
+    redis = None
+    settings_sync_task = None
+    questions_sync_task = None
+    if bot_config.tg_bot.use_redis:
+        redis = Redis.from_url(bot_config.redis.dsn())
+        settings_sync_task = setup_settings_sync(redis)
+        questions_sync_task = setup_questions_sync(redis)
+        setup_counters(redis)
+        setup_export_cache(redis)
+
+    # Команды обновляются только если изменились с прошлого запуска
+    await setup_bot_commands(bot, redis)
+
+    register_scheduler_dependencies(bot, questioner_db, main_db, redis)
+
+    # Счетчики вопросов строятся по базе один раз, дальше обновляются на лету
+    try:
+        async with QuestionerRepo(questioner_db) as questions_repo:
+            await ensure_counters(questions_repo)
+    except Exception as e:
+        logger.error(f"[Счетчики] Ошибка построения счетчиков: {e}")
 
     if bot_config.questioner.remove_old_questions:
         scheduler.add_job(
@@ -236,6 +270,20 @@ async def main():
             hours=12,
             args=[bot, questioner_db],
         )
+    scheduler.add_job(log_cache_stats, "interval", minutes=30)
+    scheduler.add_job(
+        log_request_stats, "interval", minutes=5, args=[request_scheduler]
+    )
+    scheduler.add_job(log_update_stats, "interval", minutes=5, args=[update_executor])
+    scheduler.add_job(flush_username_updates_job, "interval", seconds=5)
+    scheduler.add_job(sweep_inactive_questions, "interval", seconds=30)
+    scheduler.add_job(flush_deletion_queue, "interval", seconds=1)
+    scheduler.add_job(
+        send_attention_reminders,
+        "interval",
+        minutes=bot_config.questioner.attention_reminder_minutes,
+        id=ATTENTION_REMINDERS_JOB_ID,
+    )
     scheduler.start()
 
     existing_jobs = scheduler.get_jobs()
@@ -243,17 +291,19 @@ async def main():
         f"[Redis] Найдено {len(existing_jobs)} существующих задач в планировщике"
     )
 
+    metrics_runner = None
     try:
         if bot_config.tg_bot.use_webhook:
             # Webhook mode
             logger.info("[Режим запуска] Бот запущен в режиме webhooks")
-            await on_startup_webhook(bot, bot_config)
+            await setup_webhook(bot, bot_config, redis)
 
             # Создаем aiohttp приложение
             app = web.Application()
 
             # Регистрируем health check эндпоинт
             app.router.add_get("/health", health_check)
+            app.router.add_get("/metrics", metrics_handler)
 
             # Создаем обработчик webhook
             webhook_handler = SimpleRequestHandler(
@@ -282,20 +332,37 @@ async def main():
         else:
             # Polling mode
             logger.info("[Режим запуска] Бот запущен в режиме polling")
-            await dp.start_polling(
-                bot,
-                allowed_updates=[
-                    "message",
-                    "callback_query",
-                    "inline_query",
-                    "my_chat_member",
-                    "chat_member",
-                    "chat_join_request",
-                ],
-            )
+            await remove_webhook(bot, redis)
+
+            if bot_config.tg_bot.metrics_port:
+                app = web.Application()
+                app.router.add_get("/health", health_check)
+                app.router.add_get("/metrics", metrics_handler)
+                metrics_runner = web.AppRunner(app)
+                await metrics_runner.setup()
+                await web.TCPSite(
+                    metrics_runner,
+                    host="0.0.0.0",
+                    port=bot_config.tg_bot.metrics_port,
+                ).start()
+                logger.info(
+                    f"[Метрики] Сервер запущен на порту {bot_config.tg_bot.metrics_port}"
+                )
+
+            await dp.start_polling(bot, allowed_updates=ALLOWED_UPDATES)
     finally:
-        if bot_config.tg_bot.use_webhook:
-            await on_shutdown_webhook(bot)
+        # Вебхук не удаляется: апдейты, пришедшие во время перезапуска,
+        # дождутся следующего запуска
+        await flush_username_updates_job()
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        if settings_sync_task:
+            settings_sync_task.cancel()
+        if questions_sync_task:
+            questions_sync_task.cancel()
+        if redis:
+            await redis.aclose()
+        shutdown_export_workers()
         await stp_engine.dispose()
         await questioner_engine.dispose()
 
@@ -0,0 +1,17 @@
+import datetime
+
+from aiogram.types import Chat, Message, Update, User
+
+
+def make_message_update(update_id: int, chat_id: int, text: str) -> Update:
+    """Создает апдейт с текстовым сообщением от пользователя."""
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.datetime.now(tz=datetime.timezone.utc),
+            chat=Chat(id=chat_id, type="private" if chat_id > 0 else "supergroup"),
+            from_user=User(id=abs(chat_id), is_bot=False, first_name="Test"),
+            text=text,
+        ),
+    )
@@ -0,0 +1,38 @@
+import asyncio
+
+from tgbot.services import request_scheduler
+from tgbot.services.broadcaster import STATUS_SENT, Broadcaster
+from tgbot.services.request_scheduler import Priority, set_request_priority
+
+
+class RecordingBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, Priority | None, bool]] = []
+
+    async def send_message(self, chat_id, _text, **_kwargs) -> None:
+        self.sent.append((
+            chat_id,
+            request_scheduler._request_priority.get(),
+            request_scheduler._retry_flood_wait.get(),
+        ))
+
+
+def test_run_restores_caller_context():
+    async def handler() -> tuple[Priority | None, bool, list]:
+        set_request_priority(Priority.RELAY)
+        bot = RecordingBot()
+        report = await Broadcaster(bot, workers=1, rate=1000).run([1, "2"], "text")
+        assert report.counts() == {STATUS_SENT: 2}
+        return (
+            request_scheduler._request_priority.get(),
+            request_scheduler._retry_flood_wait.get(),
+            bot.sent,
+        )
+
+    priority, retry_flood_wait, sent = asyncio.run(handler())
+
+    # Сама рассылка идет фоном и без повторов flood wait
+    assert sent == [(1, Priority.BACKGROUND, False), (2, Priority.BACKGROUND, False)]
+    # После рассылки запросы вызывающего снова идут с его настройками
+    assert priority == Priority.RELAY
+    assert retry_flood_wait is True
@@ -0,0 +1,39 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+
+from tests.helpers import make_message_update
+from tgbot.middlewares.MetricsMiddleware import HandlerMetricsMiddleware
+from tgbot.services.metrics import handler_calls_total
+
+
+def _calls(router_name: str) -> float:
+    return handler_calls_total._values.get((router_name, "Message", "ok"), 0)
+
+
+def test_nested_router_handler_is_counted_once():
+    dp = Dispatcher()
+    parent = Router(name="metrics_parent")
+    child = Router(name="metrics_child")
+
+    @child.message()
+    async def handle(_message):
+        return None
+
+    parent.include_router(child)
+    dp.include_router(parent)
+    HandlerMetricsMiddleware().setup(dp)
+
+    before = _calls("metrics_child")
+
+    async def feed():
+        bot = Bot(token="42:TEST")
+        try:
+            await dp.feed_update(bot, make_message_update(1, 100, "text"))
+        finally:
+            await bot.session.close()
+
+    asyncio.run(feed())
+
+    assert _calls("metrics_child") - before == 1
+    assert _calls("metrics_parent") == 0
@@ -0,0 +1,77 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher
+
+from tests.helpers import make_message_update
+from tgbot.services.update_executor import UpdateExecutor
+
+BOT_TOKEN = "42:TEST"
+
+
+def _dispatcher(handled: list[str]) -> Dispatcher:
+    dp = Dispatcher()
+
+    # Outer middleware с разной задержкой, как FSMContextMiddleware с Redis:
+    # первый апдейт ждет дольше второго
+    async def slow_outer(handler, event, data):
+        await asyncio.sleep(0.05 if event.message.text == "first" else 0)
+        return await handler(event, data)
+
+    dp.update.outer_middleware(slow_outer)
+
+    @dp.message()
+    async def record(message):
+        handled.append(message.text)
+
+    return dp
+
+
+async def _feed(dp: Dispatcher, updates) -> None:
+    bot = Bot(token=BOT_TOKEN)
+    try:
+        await asyncio.gather(*(dp.feed_update(bot, update) for update in updates))
+    finally:
+        await bot.session.close()
+
+
+def test_same_chat_keeps_order_before_outer_middlewares():
+    handled: list[str] = []
+    dp = _dispatcher(handled)
+    UpdateExecutor(max_concurrent=4).setup(dp)
+
+    asyncio.run(
+        _feed(
+            dp,
+            [
+                make_message_update(1, 100, "first"),
+                make_message_update(2, 100, "second"),
+            ],
+        )
+    )
+
+    assert handled == ["first", "second"]
+
+
+def test_different_chats_run_in_parallel():
+    handled: list[str] = []
+    dp = _dispatcher(handled)
+    executor = UpdateExecutor(max_concurrent=4)
+    executor.setup(dp)
+
+    asyncio.run(
+        _feed(
+            dp,
+            [
+                make_message_update(1, 100, "first"),
+                make_message_update(2, 200, "second"),
+            ],
+        )
+    )
+
+    assert handled == ["second", "first"]
+    assert executor.stats() == {
+        "in_flight": 0,
+        "queued": 0,
+        "chats": 0,
+        "processed": 2,
+    }
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, fields
 from typing import Optional
 
 from environs import Env
@@ -15,6 +16,11 @@ class TgBot:
         Токен бота.
     use_redis : str
         Нужно ли использовать Redis.
+    max_concurrent_updates : int
+        Сколько апдейтов из разных чатов обрабатывать параллельно.
+    metrics_port : int
+        Порт эндпоинта /metrics в режиме polling (в режиме webhook метрики
+        отдаются на порту вебхука).
     """
 
     token: str
@@ -25,6 +31,8 @@ class TgBot:
     webhook_path: Optional[str] = None
     webhook_secret: Optional[str] = None
     webhook_port: int = 8443
+    max_concurrent_updates: int = 16
+    metrics_port: Optional[int] = None
 
     @staticmethod
     def from_env(env: Env):
@@ -37,6 +45,8 @@ class TgBot:
         webhook_path = env.str("WEBHOOK_PATH", "/questioner")
         webhook_secret = env.str("WEBHOOK_SECRET", None)
         webhook_port = env.int("WEBHOOK_PORT", 8443)
+        max_concurrent_updates = env.int("MAX_CONCURRENT_UPDATES", 16)
+        metrics_port = env.int("METRICS_PORT", None)
 
         return TgBot(
             token=token,
@@ -46,6 +56,8 @@ class TgBot:
             webhook_path=webhook_path,
             webhook_secret=webhook_secret,
             webhook_port=webhook_port,
+            max_concurrent_updates=max_concurrent_updates,
+            metrics_port=metrics_port,
         )
 
 
@@ -100,20 +112,30 @@ class QuestionerConfig:
         Идентификатор таблицы НЦК
     nck_trainee_sheet_name : str
         Название листа в таблице НЦК
+    attention_reminder_minutes : int
+        Через сколько минут без дежурного напоминать о вопросе
+    attention_digest : bool
+        Объединять напоминания по форуму в одно сообщение
     """
 
     remove_old_questions: bool
     remove_old_questions_days: int
+    attention_reminder_minutes: int
+    attention_digest: bool
 
     @staticmethod
     def from_env(env: Env):
         """Создает объект QuestionerConfig из переменных окружения."""
         remove_old_questions = env.bool("REMOVE_OLD_QUESTIONS")
         remove_old_questions_days = env.int("REMOVE_OLD_QUESTIONS_DAYS")
+        attention_reminder_minutes = env.int("ATTENTION_REMINDER_MINUTES", 5)
+        attention_digest = env.bool("ATTENTION_DIGEST", True)
 
         return QuestionerConfig(
             remove_old_questions=remove_old_questions,
             remove_old_questions_days=remove_old_questions_days,
+            attention_reminder_minutes=attention_reminder_minutes,
+            attention_digest=attention_digest,
         )
 
 
@@ -233,6 +255,38 @@ class RedisConfig:
         )
 
 
+@dataclass
+class DebugConfig:
+    """Класс конфигурации отладки.
+
+    Attributes:
+    ----------
+    sql_debug : bool
+        Считать SQL-запросы каждого апдейта и логировать подозрительные
+    sql_max_queries : int
+        Сколько запросов на апдейт допустимо
+    sql_repeat_threshold : int
+        С какого количества повторов одного запроса логировать N+1
+    """
+
+    sql_debug: bool = False
+    sql_max_queries: int = 20
+    sql_repeat_threshold: int = 5
+
+    @staticmethod
+    def from_env(env: Env):
+        """Создает объект DebugConfig из переменных окружения."""
+        sql_debug = env.bool("SQL_DEBUG", False)
+        sql_max_queries = env.int("SQL_MAX_QUERIES", 20)
+        sql_repeat_threshold = env.int("SQL_REPEAT_THRESHOLD", 5)
+
+        return DebugConfig(
+            sql_debug=sql_debug,
+            sql_max_queries=sql_max_queries,
+            sql_repeat_threshold=sql_repeat_threshold,
+        )
+
+
 @dataclass
 class Config:
     """Основной конфигурационный класс, интегрирующий в себя другие классы.
@@ -247,6 +301,8 @@ class Config:
         Хранит специфичные для базы данных настройки (стандартно None)
     redis : RedisConfig
         Хранит специфичные для Redis настройки (стандартно None)
+    debug : DebugConfig
+        Хранит настройки отладки
     """
 
     tg_bot: TgBot
@@ -254,18 +310,20 @@ class Config:
     questioner: QuestionerConfig
     db: DbConfig
     redis: RedisConfig
+    debug: DebugConfig
 
 
-def load_config(path: str | None = None) -> Config:
+def load_config(path: str | None = None, override: bool = False) -> Config:
     """Эта функция принимает в качестве входных данных опциональный путь к файлу и возвращает объект Config.
     :param path: Путь к файлу env, из которого загружаются переменные конфигурации.
+    :param override: Перезаписывать ли уже заданные переменные окружения значениями из файла.
     Она считывает переменные окружения из файла .env, если он указан, в противном случае — из окружения процесса.
     :return: Объект Config с атрибутами, установленными в соответствии с переменными окружения.
     """
     # Создает объект Env.
     # Объект используется для чтения файла переменных окружения.
     env = Env()
-    env.read_env(path)
+    env.read_env(path, override=override)
 
     return Config(
         tg_bot=TgBot.from_env(env),
@@ -273,4 +331,72 @@ def load_config(path: str | None = None) -> Config:
         questioner=QuestionerConfig.from_env(env),
         db=DbConfig.from_env(env),
         redis=RedisConfig.from_env(env),
+        debug=DebugConfig.from_env(env),
     )
+
+
+# Общий конфиг процесса, загружается один раз при запуске бота
+_config: Config | None = None
+_config_path: str | None = None
+
+
+def default_config_path() -> str:
+    """Путь к файлу env: переменная CONFIG_PATH или .env в рабочей папке."""
+    return os.environ.get("CONFIG_PATH", ".env")
+
+
+def setup_config(path: str | None = None) -> Config:
+    """Загружает общий конфиг процесса.
+
+    Вызывается один раз при запуске, остальные модули получают
+    конфиг через get_config().
+
+    Args:
+        path: Путь к файлу env, по умолчанию default_config_path()
+
+    Returns:
+        Загруженный конфиг
+    """
+    global _config, _config_path
+    _config_path = path or default_config_path()
+    _config = load_config(_config_path)
+    return _config
+
+
+def get_config() -> Config:
+    """Возвращает общий конфиг процесса, загружая его при первом обращении."""
+    if _config is None:
+        return setup_config(_config_path)
+    return _config
+
+
+def reload_config() -> bool:
+    """Перечитывает файл env и обновляет настройки вопросника.
+
+    Токен, базы, Redis и вебхук применяются только при запуске, поэтому
+    на лету обновляется только QuestionerConfig. Поля обновляются в том же
+    объекте, поэтому ссылки на config и config.questioner остаются
+    актуальными. Задачи планировщика, созданные при запуске, сами
+    не перенастраиваются.
+
+    Returns:
+        True, если настройки вопросника изменились
+
+    Raises:
+        FileNotFoundError: Файл env не найден
+    """
+    config = get_config()
+    if not os.path.isfile(_config_path):
+        raise FileNotFoundError(_config_path)
+
+    questioner = load_config(_config_path, override=True).questioner
+    if questioner == config.questioner:
+        return False
+
+    for config_field in fields(QuestionerConfig):
+        setattr(
+            config.questioner,
+            config_field.name,
+            getattr(questioner, config_field.name),
+        )
+    return True
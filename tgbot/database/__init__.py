@@ -0,0 +1,39 @@
+"""Обертки над репозиториями stp_database с кешированием горячих запросов."""
+
+from .cache import MISSING, TTLCache, cache_stats, snapshot
+from .counters import (
+    ROLE_DUTY,
+    ROLE_EMPLOYEE,
+    ensure_counters,
+    get_question_counts,
+    rebuild_counters,
+    setup_counters,
+)
+from .employees import (
+    flush_username_updates,
+    invalidate_employee,
+    queue_username_update,
+)
+from .questions import setup_questions_sync
+from .repo import QuestionerRepo, StpRepo
+from .settings import setup_settings_sync
+
+__all__ = [
+    "MISSING",
+    "QuestionerRepo",
+    "ROLE_DUTY",
+    "ROLE_EMPLOYEE",
+    "StpRepo",
+    "TTLCache",
+    "cache_stats",
+    "ensure_counters",
+    "get_question_counts",
+    "flush_username_updates",
+    "invalidate_employee",
+    "queue_username_update",
+    "rebuild_counters",
+    "setup_counters",
+    "setup_questions_sync",
+    "setup_settings_sync",
+    "snapshot",
+]
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from sqlalchemy import inspect
+
+# Маркер отсутствия записи в кеше (None - валидное закешированное значение)
+MISSING = object()
+
+# Реестр созданных кешей для сбора статистики
+caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """LRU-кеш с ограниченным временем жизни записей.
+
+    Args:
+        name: Название кеша для статистики
+        maxsize: Максимальное количество записей
+        ttl: Время жизни записи в секундах
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        caches[name] = self
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Получает значение из кеша.
+
+        Args:
+            key: Ключ записи
+            default: Значение, возвращаемое при промахе
+
+        Returns:
+            Закешированное значение или default
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Записывает значение в кеш, вытесняя самую старую запись при переполнении."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Any:
+        """Удаляет запись из кеша.
+
+        Returns:
+            Удаленное значение или MISSING
+        """
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else MISSING
+
+    def pop_where(self, predicate) -> int:
+        """Удаляет записи, значения которых удовлетворяют условию.
+
+        Args:
+            predicate: Функция, принимающая значение записи
+
+        Returns:
+            Количество удаленных записей
+        """
+        keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Статистика использования кеша."""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Статистика всех зарегистрированных кешей."""
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+def snapshot(instance):
+    """Копирует значения колонок ORM-объекта в новый объект, не привязанный к сессии.
+
+    Снимок безопасно хранить между апдейтами: он не зависит от закрытия
+    или коммита сессии, в которой был загружен исходный объект.
+
+    Args:
+        instance: ORM-объект
+
+    Returns:
+        Новый экземпляр того же класса или None
+    """
+    if instance is None:
+        return None
+
+    mapper = inspect(instance).mapper
+    return mapper.class_(**{
+        attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs
+    })
@@ -0,0 +1,226 @@
+"""Счетчики вопросов по пользователям и дням.
+
+Для каждого пользователя и дня хранится множество токенов вопросов:
+созданных специалистом (employee) и закрытых дежурным (duty). Множества
+делают обновление идемпотентным: повторное закрытие вопроса после возврата
+не увеличивает счетчик. Чтение за день или месяц не зависит от размера
+таблицы вопросов.
+"""
+
+import datetime
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+import pytz
+from redis.asyncio import Redis
+from stp_database.models.Questions import Question
+
+logger = logging.getLogger(__name__)
+
+ROLE_EMPLOYEE = "employee"
+ROLE_DUTY = "duty"
+
+TIMEZONE = pytz.timezone("Asia/Yekaterinburg")
+
+# Дни хранятся чуть дольше месяца, чтобы хватало на счетчик за месяц
+COUNTERS_TTL = 40 * 24 * 60 * 60
+
+# На сколько дней раньше периода искать вопросы при пересчете
+REBUILD_LOOKBACK_DAYS = 7
+
+CounterKey = tuple[str, int, datetime.date]
+
+
+class MemoryCounterStore:
+    """Счетчики в памяти процесса."""
+
+    def __init__(self) -> None:
+        self._tokens: dict[CounterKey, set[str]] = defaultdict(set)
+        self.built = False
+
+    async def add(self, key: CounterKey, token: str) -> None:
+        self._tokens[key].add(token)
+
+    async def counts(self, keys: list[CounterKey]) -> list[int]:
+        return [len(self._tokens.get(key, ())) for key in keys]
+
+    async def replace(
+        self, since: datetime.date, tokens: dict[CounterKey, set[str]]
+    ) -> None:
+        """Заменяет счетчики начиная с дня since."""
+        self._tokens = defaultdict(
+            set, {key: value for key, value in self._tokens.items() if key[2] < since}
+        )
+        self._tokens.update(tokens)
+        self.built = True
+
+    async def is_built(self) -> bool:
+        return self.built
+
+
+class RedisCounterStore:
+    """Счетчики в Redis: одно множество токенов на пользователя и день."""
+
+    KEY_PREFIX = "questioner:counters"
+    BUILT_KEY = "questioner:counters:built"
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    def _key(self, key: CounterKey) -> str:
+        role, user_id, day = key
+        return f"{self.KEY_PREFIX}:{role}:{user_id}:{day.isoformat()}"
+
+    async def add(self, key: CounterKey, token: str) -> None:
+        redis_key = self._key(key)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(redis_key, token)
+            pipe.expire(redis_key, COUNTERS_TTL)
+            await pipe.execute()
+
+    async def counts(self, keys: list[CounterKey]) -> list[int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.scard(self._key(key))
+            return await pipe.execute()
+
+    async def replace(
+        self, since: datetime.date, tokens: dict[CounterKey, set[str]]
+    ) -> None:
+        stale_keys = []
+        async for redis_key in self.redis.scan_iter(
+            match=f"{self.KEY_PREFIX}:*:*:*", count=1000
+        ):
+            if isinstance(redis_key, bytes):
+                redis_key = redis_key.decode()
+            day = redis_key.rsplit(":", 1)[-1]
+            if day >= since.isoformat():
+                stale_keys.append(redis_key)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if stale_keys:
+                pipe.delete(*stale_keys)
+            for key, key_tokens in tokens.items():
+                redis_key = self._key(key)
+                pipe.sadd(redis_key, *key_tokens)
+                pipe.expire(redis_key, COUNTERS_TTL)
+            pipe.set(self.BUILT_KEY, datetime.datetime.now(tz=TIMEZONE).isoformat())
+            await pipe.execute()
+
+    async def is_built(self) -> bool:
+        return bool(await self.redis.exists(self.BUILT_KEY))
+
+
+_store: MemoryCounterStore | RedisCounterStore = MemoryCounterStore()
+
+
+def setup_counters(redis: Redis) -> None:
+    """Переключает счетчики на хранение в Redis."""
+    global _store
+    _store = RedisCounterStore(redis)
+
+
+def _today() -> datetime.date:
+    return datetime.datetime.now(tz=TIMEZONE).date()
+
+
+def _day(value: datetime.datetime | None) -> datetime.date:
+    return value.date() if value else _today()
+
+
+async def record_question_created(question: Question) -> None:
+    """Учитывает созданный вопрос в счетчике специалиста."""
+    try:
+        await _store.add(
+            (ROLE_EMPLOYEE, int(question.employee_userid), _day(question.start_time)),
+            question.token,
+        )
+    except Exception as e:
+        logger.error(f"[Счетчики] Ошибка учета вопроса {question.token}: {e}")
+
+
+async def record_question_closed(question: Question) -> None:
+    """Учитывает закрытый вопрос в счетчике дежурного."""
+    if not question.duty_userid:
+        return
+    try:
+        await _store.add(
+            (ROLE_DUTY, int(question.duty_userid), _day(question.end_time)),
+            question.token,
+        )
+    except Exception as e:
+        logger.error(f"[Счетчики] Ошибка учета вопроса {question.token}: {e}")
+
+
+async def get_question_counts(role: str, user_id: int) -> tuple[int, int]:
+    """Получает количество вопросов пользователя за сегодня и текущий месяц.
+
+    Args:
+        role: ROLE_EMPLOYEE - созданные вопросы, ROLE_DUTY - закрытые дежурным
+        user_id: Идентификатор пользователя
+
+    Returns:
+        Количество за сегодня и за текущий месяц
+    """
+    today = _today()
+    days = [today.replace(day=day) for day in range(1, today.day + 1)]
+    counts = await _store.counts([(role, int(user_id), day) for day in days])
+    return counts[-1], sum(counts)
+
+
+def _collect_tokens(questions: Iterable) -> dict[CounterKey, set[str]]:
+    tokens: dict[CounterKey, set[str]] = defaultdict(set)
+    for question in questions:
+        employee_key = (
+            ROLE_EMPLOYEE,
+            int(question.employee_userid),
+            _day(question.start_time),
+        )
+        tokens[employee_key].add(question.token)
+
+        if question.status == "closed" and question.duty_userid:
+            duty_key = (ROLE_DUTY, int(question.duty_userid), _day(question.end_time))
+            tokens[duty_key].add(question.token)
+    return tokens
+
+
+async def rebuild_counters(questions_repo, since: datetime.date | None = None) -> int:
+    """Пересчитывает счетчики по базе начиная с дня since.
+
+    Args:
+        questions_repo: Репозиторий базы вопросника
+        since: Первый пересчитываемый день, по умолчанию - начало текущего месяца
+
+    Returns:
+        Количество учтенных вопросов
+    """
+    since = since or _today().replace(day=1)
+    # Вопрос мог быть создан раньше начала периода, а закрыт внутри него
+    start = datetime.datetime.combine(
+        since - datetime.timedelta(days=REBUILD_LOOKBACK_DAYS), datetime.time()
+    )
+    end = datetime.datetime.combine(
+        _today() + datetime.timedelta(days=1), datetime.time()
+    )
+
+    tokens: dict[CounterKey, set[str]] = defaultdict(set)
+    questions_count = 0
+    async for chunk in questions_repo.questions.iter_export_rows(start=start, end=end):
+        questions_count += len(chunk)
+        for key, key_tokens in _collect_tokens(chunk).items():
+            tokens[key] |= key_tokens
+
+    tokens = {key: value for key, value in tokens.items() if key[2] >= since}
+
+    await _store.replace(since, tokens)
+    logger.info(
+        f"[Счетчики] Пересчитано с {since.isoformat()}: вопросов {questions_count}"
+    )
+    return questions_count
+
+
+async def ensure_counters(questions_repo) -> None:
+    """Строит счетчики при первом запуске, если они еще не построены."""
+    if not await _store.is_built():
+        await rebuild_counters(questions_repo)
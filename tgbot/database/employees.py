@@ -0,0 +1,185 @@
+import logging
+from typing import Collection, Iterable, Sequence
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from stp_database.models.STP import Employee
+
+from tgbot.database.cache import MISSING, TTLCache, snapshot
+from tgbot.database.instrumentation import track_repo_attr, track_repo_methods
+
+logger = logging.getLogger(__name__)
+
+# Сотрудники: user_id -> снимок сотрудника или None
+employees_cache = TTLCache("employees", maxsize=2048, ttl=300)
+
+# Отложенные изменения юзернеймов: user_id -> новый юзернейм
+_pending_usernames: dict[int, str | None] = {}
+
+
+def invalidate_employee(user_id: int) -> None:
+    """Удаляет сотрудника из кеша."""
+    employees_cache.pop(user_id)
+
+
+def queue_username_update(employee: Employee, username: str | None) -> None:
+    """Ставит изменение юзернейма в очередь на запись в базу.
+
+    Снимок сотрудника обновляется сразу, поэтому повторные апдейты
+    не ставят запись в очередь снова. Несколько изменений одного
+    пользователя до сброса очереди схлопываются в одно.
+
+    Args:
+        employee: Снимок сотрудника из кеша
+        username: Новый юзернейм
+    """
+    employee.username = username
+    _pending_usernames[employee.user_id] = username
+
+
+async def flush_username_updates(session: AsyncSession) -> int:
+    """Записывает накопленные изменения юзернеймов одной транзакцией.
+
+    Args:
+        session: Сессия основной базы СТП
+
+    Returns:
+        Количество обновленных пользователей
+    """
+    if not _pending_usernames:
+        return 0
+
+    batch = dict(_pending_usernames)
+    _pending_usernames.clear()
+
+    try:
+        for user_id, username in batch.items():
+            await session.execute(
+                update(Employee)
+                .where(Employee.user_id == user_id)
+                .values(username=username)
+            )
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        # Возвращаем изменения в очередь, не перетирая более свежие
+        for user_id, username in batch.items():
+            _pending_usernames.setdefault(user_id, username)
+        raise
+
+    return len(batch)
+
+
+@track_repo_methods("employee")
+class CachedEmployeeRepo:
+    """Обертка над репозиторием сотрудников с TTL/LRU кешем по user_id.
+
+    Кеш общий для middleware, хендлеров и задач планировщика.
+    """
+
+    def __init__(self, owner) -> None:
+        self._owner = owner
+
+    @property
+    def _repo(self):
+        return self._owner.requests_repo.employee
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._owner.session
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return track_repo_attr(getattr(self._repo, name), f"employee.{name}")
+
+    async def get_users(self, **kwargs):
+        """Получает сотрудников.
+
+        Поиск одного сотрудника по user_id обслуживается из кеша,
+        остальные варианты поиска идут напрямую в репозиторий.
+        """
+        user_id = kwargs.get("user_id")
+        if kwargs.keys() != {"user_id"} or user_id is None:
+            return await self._repo.get_users(**kwargs)
+
+        employee = employees_cache.get(user_id)
+        if employee is not MISSING:
+            return employee
+
+        employee: Employee | None = snapshot(
+            await self._repo.get_users(user_id=user_id)
+        )
+        employees_cache.set(user_id, employee)
+        return employee
+
+    async def get_users_by_ids(
+        self, user_ids: Iterable[int | None]
+    ) -> dict[int, Employee | None]:
+        """Получает сотрудников по набору user_id.
+
+        Найденные в кеше сотрудники берутся из него, остальные загружаются
+        одним запросом и кладутся в кеш, включая отсутствующих в базе.
+
+        Args:
+            user_ids: Идентификаторы сотрудников, None пропускаются
+
+        Returns:
+            Словарь user_id -> снимок сотрудника или None
+        """
+        employees: dict[int, Employee | None] = {}
+        missing = set()
+        for user_id in user_ids:
+            if user_id is None or user_id in employees:
+                continue
+            employee = employees_cache.get(user_id)
+            if employee is MISSING:
+                missing.add(user_id)
+            else:
+                employees[user_id] = employee
+
+        if missing:
+            result = await self.session.execute(
+                select(Employee).where(Employee.user_id.in_(missing))
+            )
+            found = {
+                employee.user_id: snapshot(employee)
+                for employee in result.scalars().all()
+            }
+            for user_id in missing:
+                employee = found.get(user_id)
+                employees_cache.set(user_id, employee)
+                employees[user_id] = employee
+
+        return employees
+
+    async def get_employee_rows(
+        self,
+        user_ids: Collection[int] | None = None,
+        division: str | None = None,
+    ) -> Sequence[Row]:
+        """Получает краткие данные сотрудников: user_id, fullname, division.
+
+        Args:
+            user_ids: Идентификаторы нужных сотрудников
+            division: Направление (поиск по вхождению, без учета регистра)
+
+        Returns:
+            Строки сотрудников, подходящих под все переданные условия
+        """
+        if user_ids is not None and not user_ids:
+            return []
+
+        query = select(Employee.user_id, Employee.fullname, Employee.division)
+        if user_ids is not None:
+            query = query.where(Employee.user_id.in_(user_ids))
+        if division:
+            query = query.where(Employee.division.ilike(f"%{division}%"))
+
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def update_user(self, user_id: int, **kwargs):
+        result = await self._repo.update_user(user_id=user_id, **kwargs)
+        invalidate_employee(user_id)
+        return result
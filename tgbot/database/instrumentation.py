@@ -0,0 +1,136 @@
+"""Учет обращений к базе: выдача соединений и запросы по методам репозиториев.
+
+Метод репозитория, из которого выполняется запрос, передается через
+ContextVar: обертки репозиториев выставляют его на время вызова, а
+обработчики событий движка SQLAlchemy читают при выполнении запроса.
+Также через ContextVar передается журнал запросов текущего апдейта.
+"""
+
+import functools
+import inspect
+import re
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Метод репозитория, выполняющийся в текущей задаче
+current_repo_method: ContextVar[str | None] = ContextVar(
+    "current_repo_method", default=None
+)
+
+# Журнал запросов апдейта, заполняется только в режиме отладки SQL
+current_query_log: ContextVar["QueryLog | None"] = ContextVar(
+    "current_query_log", default=None
+)
+
+# Сколько раз пул выдал соединение: база -> количество
+db_checkouts: dict[str, int] = defaultdict(int)
+
+# Выполненные запросы: (база, метод репозитория) -> количество
+db_queries: dict[tuple[str, str], int] = defaultdict(int)
+
+
+@dataclass
+class QueryLog:
+    """SQL-запросы, выполненные при обработке одного апдейта.
+
+    Attributes:
+        statements: Количество запросов по (метод репозитория, форма запроса)
+    """
+
+    statements: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated(self, min_count: int) -> list[tuple[tuple[str, str], int]]:
+        """Запросы одной формы, выполненные не меньше min_count раз."""
+        return [
+            (key, count)
+            for key, count in self.statements.most_common()
+            if count >= min_count
+        ]
+
+
+def statement_shape(statement: str) -> str:
+    """Приводит запрос к форме, не зависящей от значений параметров.
+
+    Значения уже вынесены в параметры, остается схлопнуть пробелы
+    и списки IN разной длины.
+    """
+    shape = re.sub(r"\s+", " ", statement).strip()
+    return re.sub(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)", "(...)", shape)
+
+
+def _track(func, name: str):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_repo_method.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_repo_method.reset(token)
+
+    return wrapper
+
+
+def track_repo_attr(value, name: str):
+    """Оборачивает асинхронный метод репозитория, остальное возвращает как есть."""
+    if inspect.iscoroutinefunction(value):
+        return _track(value, name)
+    return value
+
+
+def track_repo_methods(prefix: str):
+    """Декоратор класса-обертки: помечает запросы его асинхронных методов.
+
+    Args:
+        prefix: Имя репозитория в метриках, например questions
+    """
+
+    def decorator(cls):
+        for name, value in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(value):
+                setattr(cls, name, _track(value, f"{prefix}.{name}"))
+        return cls
+
+    return decorator
+
+
+class TrackedRepo:
+    """Прокси репозитория stp_database, помечающий запросы его методов."""
+
+    def __init__(self, repo, prefix: str) -> None:
+        self._tracked_repo = repo
+        self._tracked_prefix = prefix
+
+    def __getattr__(self, name):
+        return track_repo_attr(
+            getattr(self._tracked_repo, name), f"{self._tracked_prefix}.{name}"
+        )
+
+
+def instrument_engine(engine: AsyncEngine, db_name: str) -> None:
+    """Подключает учет соединений и запросов к движку базы.
+
+    Args:
+        engine: Асинхронный движок SQLAlchemy
+        db_name: Имя базы в метриках
+    """
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(*_args) -> None:
+        db_checkouts[db_name] += 1
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def on_execute(_conn, _cursor, statement, *_args) -> None:
+        method = current_repo_method.get() or "other"
+        db_queries[(db_name, method)] += 1
+
+        query_log = current_query_log.get()
+        if query_log is not None:
+            query_log.statements[(method, statement_shape(statement))] += 1
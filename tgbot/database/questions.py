@@ -0,0 +1,414 @@
+import asyncio
+import datetime
+import json
+import logging
+from typing import AsyncIterator, Collection, Sequence
+
+import pytz
+from redis.asyncio import Redis
+from sqlalchemy import Row, and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from stp_database.models.Questions import Question
+
+from tgbot.database.cache import MISSING, TTLCache, snapshot
+from tgbot.database.counters import record_question_closed, record_question_created
+from tgbot.database.instrumentation import track_repo_attr, track_repo_methods
+from tgbot.database.settings import INSTANCE_ID
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("open", "in_progress")
+
+# Сколько времени после закрытия вопрос можно вернуть
+RETURN_WINDOW = datetime.timedelta(hours=24)
+
+QUESTIONS_CHANNEL = "questioner:questions"
+
+# Индекс активных вопросов: employee_userid -> снимок вопроса или None
+active_questions_index = TTLCache("active_questions", maxsize=4096, ttl=600)
+
+# Колонки вопросов, нужные для выгрузки статистики
+EXPORT_COLUMNS = (
+    Question.token,
+    Question.employee_userid,
+    Question.duty_userid,
+    Question.question_text,
+    Question.start_time,
+    Question.end_time,
+    Question.clever_link,
+    Question.quality_employee,
+    Question.quality_duty,
+    Question.status,
+    Question.allow_return,
+)
+
+# Вопросы топиков форумов: (group_id, topic_id) -> снимок вопроса или None
+topic_questions_cache = TTLCache("topic_questions", maxsize=2048, ttl=600)
+
+
+def _cache_question(question: Question) -> None:
+    """Актуализирует кеши по свежему состоянию вопроса."""
+    question = snapshot(question)
+
+    topic_questions_cache.set((question.group_id, question.topic_id), question)
+
+    if question.status in ACTIVE_STATUSES:
+        active_questions_index.set(question.employee_userid, question)
+    else:
+        active_questions_index.set(question.employee_userid, None)
+
+
+def _forget_question(token: str) -> None:
+    """Удаляет вопрос из всех кешей."""
+    topic_questions_cache.pop_where(lambda q: q is not None and q.token == token)
+    active_questions_index.pop_where(lambda q: q is not None and q.token == token)
+
+
+_redis: Redis | None = None
+
+
+def setup_questions_sync(redis: Redis) -> asyncio.Task:
+    """Включает сброс кешей вопросов между репликами через Redis pub/sub.
+
+    Без синхронизации реплика, на которой вопрос не менялся, до истечения
+    TTL считала бы специалиста свободным или занятым по старому снимку.
+
+    Args:
+        redis: Клиент Redis
+
+    Returns:
+        Задача, слушающая уведомления об изменении вопросов
+    """
+    global _redis
+    _redis = redis
+    return asyncio.create_task(_listen_question_updates(redis))
+
+
+async def _publish_question_update(
+    tokens: Collection[str], questions: Collection[Question] = ()
+) -> None:
+    """Уведомляет другие реплики об изменении вопросов."""
+    if _redis is None or not (tokens or questions):
+        return
+
+    payload = {
+        "instance": INSTANCE_ID,
+        "tokens": list(tokens),
+        "employees": [question.employee_userid for question in questions],
+        "topics": [[question.group_id, question.topic_id] for question in questions],
+    }
+    try:
+        await _redis.publish(QUESTIONS_CHANNEL, json.dumps(payload))
+    except Exception as e:
+        logger.error(f"[Вопросы] Ошибка публикации изменения вопросов: {e}")
+
+
+async def _listen_question_updates(redis: Redis) -> None:
+    """Сбрасывает кеши вопросов по уведомлениям других реплик."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(QUESTIONS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    payload = json.loads(message["data"])
+                    if payload["instance"] == INSTANCE_ID:
+                        continue
+
+                    for token in payload["tokens"]:
+                        _forget_question(token)
+                    for employee_userid in payload["employees"]:
+                        active_questions_index.pop(employee_userid)
+                    for group_id, topic_id in payload["topics"]:
+                        topic_questions_cache.pop((group_id, topic_id))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Вопросы] Ошибка подписки на изменения вопросов: {e}")
+            await asyncio.sleep(5)
+
+
+@track_repo_methods("questions")
+class CachedQuestionsRepo:
+    """Обертка над репозиторием вопросов с кешированием горячих запросов.
+
+    Все методы, не переопределенные здесь, проксируются в исходный репозиторий.
+    Методы изменения вопросов поддерживают кеши в актуальном состоянии
+    и уведомляют остальные реплики.
+    """
+
+    def __init__(self, owner) -> None:
+        self._owner = owner
+
+    @property
+    def _repo(self):
+        return self._owner.requests_repo.questions
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._owner.session
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return track_repo_attr(getattr(self._repo, name), f"questions.{name}")
+
+    async def get_question(self, **kwargs) -> Question | None:
+        """Получает вопрос.
+
+        Поиск по топику форума (только group_id и topic_id) обслуживается
+        из кеша, остальные варианты поиска идут напрямую в репозиторий.
+        """
+        if kwargs.keys() != {"group_id", "topic_id"}:
+            return await self._repo.get_question(**kwargs)
+
+        key = (kwargs["group_id"], kwargs["topic_id"])
+        question = topic_questions_cache.get(key)
+        if question is not MISSING:
+            return question
+
+        question = snapshot(await self._repo.get_question(**kwargs))
+        topic_questions_cache.set(key, question)
+        return question
+
+    async def get_active_question(self, employee_userid: int) -> Question | None:
+        """Получает активный вопрос специалиста.
+
+        Сначала проверяется индекс, при промахе выполняется точечный запрос
+        по специалисту и статусу. Изменения вопросов на других репликах
+        сбрасывают индекс через QUESTIONS_CHANNEL.
+
+        Args:
+            employee_userid: Идентификатор специалиста
+
+        Returns:
+            Активный вопрос или None
+        """
+        question = active_questions_index.get(employee_userid)
+        if question is not MISSING:
+            return question
+
+        result = await self.session.execute(
+            select(Question)
+            .where(
+                Question.employee_userid == employee_userid,
+                Question.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(Question.start_time.desc())
+            .limit(1)
+        )
+        question = snapshot(result.scalars().first())
+
+        active_questions_index.set(employee_userid, question)
+        return question
+
+    async def has_active_question(self, employee_userid: int) -> bool:
+        """Проверяет, есть ли у специалиста активный вопрос.
+
+        Всегда выполняет запрос EXISTS по (employee_userid, status), без
+        кеша: вопрос мог быть открыт или закрыт на другой реплике, а от
+        результата зависит возврат вопроса.
+        """
+        result = await self.session.execute(
+            select(
+                exists().where(
+                    Question.employee_userid == employee_userid,
+                    Question.status.in_(ACTIVE_STATUSES),
+                )
+            )
+        )
+        return bool(result.scalar())
+
+    async def get_returnable_question(
+        self, token: str, employee_userid: int | None = None
+    ) -> Question | None:
+        """Получает вопрос, если его можно вернуть прямо сейчас.
+
+        Вопрос можно вернуть, если он закрыт, возврат разрешен и с момента
+        закрытия прошло не больше RETURN_WINDOW.
+
+        Args:
+            token: Токен вопроса
+            employee_userid: Специалист, который возвращает вопрос, None - любой
+
+        Returns:
+            Вопрос или None, если вернуть его нельзя
+        """
+        query = select(Question).where(
+            Question.token == token,
+            Question.status == "closed",
+            Question.allow_return.is_(True),
+            Question.end_time
+            >= datetime.datetime.now(tz=pytz.timezone("Asia/Yekaterinburg"))
+            - RETURN_WINDOW,
+        )
+        if employee_userid is not None:
+            query = query.where(Question.employee_userid == employee_userid)
+
+        result = await self.session.execute(query.limit(1))
+        return result.scalars().first()
+
+    async def is_returnable(
+        self, token: str, employee_userid: int | None = None
+    ) -> bool:
+        """Проверяет, можно ли вернуть вопрос прямо сейчас.
+
+        Условия те же, что у get_returnable_question.
+        """
+        return await self.get_returnable_question(token, employee_userid) is not None
+
+    async def get_unassigned_questions(
+        self, started_before: datetime.datetime
+    ) -> Sequence[Question]:
+        """Получает открытые вопросы без дежурного, созданные до указанного времени.
+
+        Args:
+            started_before: Граница времени создания вопроса
+
+        Returns:
+            Вопросы, отсортированные по форуму и времени создания
+        """
+        result = await self.session.execute(
+            select(Question)
+            .where(
+                Question.status == "open",
+                Question.duty_userid.is_(None),
+                Question.start_time <= started_before,
+            )
+            .order_by(Question.group_id, Question.start_time)
+        )
+        return result.scalars().all()
+
+    async def get_in_progress_page(
+        self,
+        group_id: int,
+        after_token: str | None = None,
+        limit: int = 10,
+    ) -> Sequence[Question]:
+        """Получает страницу вопросов форума, находящихся в работе.
+
+        Страницы выбираются по ключу (start_time, token) после вопроса
+        after_token, поэтому стоимость запроса не зависит от номера страницы.
+
+        Args:
+            group_id: Идентификатор форума
+            after_token: Токен последнего вопроса предыдущей страницы
+            limit: Размер страницы
+
+        Returns:
+            Вопросы страницы в порядке времени создания
+        """
+        query = select(Question).where(
+            Question.group_id == group_id, Question.status == "in_progress"
+        )
+        if after_token:
+            cursor = (
+                select(Question.start_time)
+                .where(Question.token == after_token)
+                .scalar_subquery()
+            )
+            query = query.where(
+                or_(
+                    Question.start_time > cursor,
+                    and_(
+                        Question.start_time == cursor,
+                        Question.token > after_token,
+                    ),
+                )
+            )
+
+        result = await self.session.execute(
+            query.order_by(Question.start_time, Question.token).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def iter_export_rows(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        employee_userids: Collection[int] | None = None,
+        chunk_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Постранично получает строки вопросов за период для выгрузки.
+
+        Выбираются только нужные для выгрузки колонки, без ORM объектов.
+        Страницы выбираются по ключу (start_time, token), поэтому стоимость
+        запроса не растет с номером страницы, а в памяти одновременно
+        находится только одна страница.
+
+        Args:
+            start: Начало периода (включительно)
+            end: Конец периода (не включительно)
+            employee_userids: Ограничение по специалистам, None - без ограничения
+            chunk_size: Размер страницы
+
+        Yields:
+            Строки страницы в порядке времени создания
+        """
+        if employee_userids is not None and not employee_userids:
+            return
+
+        query = select(*EXPORT_COLUMNS).where(
+            Question.start_time >= start, Question.start_time < end
+        )
+        if employee_userids is not None:
+            query = query.where(Question.employee_userid.in_(employee_userids))
+
+        last_row = None
+        while True:
+            page_query = query
+            if last_row is not None:
+                page_query = page_query.where(
+                    or_(
+                        Question.start_time > last_row.start_time,
+                        and_(
+                            Question.start_time == last_row.start_time,
+                            Question.token > last_row.token,
+                        ),
+                    )
+                )
+            result = await self.session.execute(
+                page_query.order_by(Question.start_time, Question.token).limit(
+                    chunk_size
+                )
+            )
+            chunk = result.all()
+            if not chunk:
+                return
+
+            yield chunk
+
+            if len(chunk) < chunk_size:
+                return
+            last_row = chunk[-1]
+
+    async def add_question(self, **kwargs) -> Question:
+        question = await self._repo.add_question(**kwargs)
+        _cache_question(question)
+        await _publish_question_update([question.token], [question])
+        await record_question_created(question)
+        return question
+
+    async def update_question(self, token: str, **kwargs) -> Question:
+        question = await self._repo.update_question(token=token, **kwargs)
+        if question is not None:
+            _cache_question(question)
+            await _publish_question_update([token], [question])
+            if kwargs.get("status") == "closed":
+                await record_question_closed(question)
+        else:
+            _forget_question(token)
+            await _publish_question_update([token])
+        return question
+
+    async def delete_question(self, **kwargs):
+        result = await self._repo.delete_question(**kwargs)
+
+        tokens = [kwargs["token"]] if kwargs.get("token") else []
+        tokens.extend(question.token for question in kwargs.get("questions") or [])
+        for token in tokens:
+            _forget_question(token)
+        await _publish_question_update(tokens)
+        return result
@@ -0,0 +1,94 @@
+from functools import cached_property
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from stp_database.repo.Questions import QuestionsRequestsRepo
+from stp_database.repo.STP import MainRequestsRepo
+
+from tgbot.database.employees import CachedEmployeeRepo
+from tgbot.database.instrumentation import TrackedRepo
+from tgbot.database.questions import CachedQuestionsRepo
+from tgbot.database.settings import CachedSettingsRepo
+
+
+class LazyRepo:
+    """Базовый репозиторий с ленивым открытием сессии.
+
+    Сессия создается только при первом запросе, который не удалось обслужить
+    из кеша, и закрывается вызовом close() или при выходе из async with.
+    Репозиторий одноразовый: после закрытия запросы к базе вызывают
+    RuntimeError, а не открывают новую сессию, которую некому закрыть.
+
+    Args:
+        session_pool: Фабрика сессий базы данных
+    """
+
+    requests_repo_class: type
+
+    def __init__(self, session_pool: async_sessionmaker[AsyncSession]) -> None:
+        self._session_pool = session_pool
+        self._session: AsyncSession | None = None
+        self._closed = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._closed:
+            raise RuntimeError(
+                f"{type(self).__name__} уже закрыт, создайте новый репозиторий"
+            )
+        if self._session is None:
+            self._session = self._session_pool()
+        return self._session
+
+    @cached_property
+    def requests_repo(self):
+        """Исходный репозиторий stp_database, привязанный к сессии."""
+        return self.requests_repo_class(session=self.session)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name == "requests_repo":
+            raise AttributeError(name)
+        return TrackedRepo(getattr(self.requests_repo, name), name)
+
+    async def close(self) -> None:
+        """Закрывает сессию, если она была открыта, и сам репозиторий."""
+        self._closed = True
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self.__dict__.pop("requests_repo", None)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc_info) -> None:
+        await self.close()
+
+
+class QuestionerRepo(LazyRepo):
+    """Репозиторий базы вопросника с кешированным доступом к вопросам и настройкам.
+
+    Совместим с QuestionsRequestsRepo: недостающие атрибуты берутся из него.
+    """
+
+    requests_repo_class = QuestionsRequestsRepo
+
+    @cached_property
+    def questions(self) -> CachedQuestionsRepo:
+        return CachedQuestionsRepo(self)
+
+    @cached_property
+    def settings(self) -> CachedSettingsRepo:
+        return CachedSettingsRepo(self)
+
+
+class StpRepo(LazyRepo):
+    """Репозиторий основной базы СТП с кешированным доступом к сотрудникам.
+
+    Совместим с MainRequestsRepo: недостающие атрибуты берутся из него.
+    """
+
+    requests_repo_class = MainRequestsRepo
+
+    @cached_property
+    def employee(self) -> CachedEmployeeRepo:
+        return CachedEmployeeRepo(self)
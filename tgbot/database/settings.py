@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import uuid
+
+from redis.asyncio import Redis
+
+from tgbot.database.cache import MISSING, TTLCache, snapshot
+from tgbot.database.instrumentation import track_repo_attr, track_repo_methods
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_CHANNEL = "questioner:settings"
+
+# Идентификатор процесса, чтобы не обрабатывать собственные уведомления
+INSTANCE_ID = uuid.uuid4().hex
+
+# Настройки форумов: group_id -> снимок настроек
+settings_cache = TTLCache("group_settings", maxsize=64, ttl=3600)
+
+_redis: Redis | None = None
+
+
+def setup_settings_sync(redis: Redis) -> asyncio.Task:
+    """Включает синхронизацию кеша настроек между репликами через Redis pub/sub.
+
+    Args:
+        redis: Клиент Redis
+
+    Returns:
+        Задача, слушающая уведомления об изменении настроек
+    """
+    global _redis
+    _redis = redis
+    return asyncio.create_task(_listen_settings_updates(redis))
+
+
+async def _publish_settings_update(group_id: int) -> None:
+    """Уведомляет другие реплики об изменении настроек форума."""
+    if _redis is None:
+        return
+
+    try:
+        await _redis.publish(SETTINGS_CHANNEL, f"{INSTANCE_ID}:{group_id}")
+    except Exception as e:
+        logger.error(
+            f"[Настройки] Ошибка публикации изменения настроек {group_id}: {e}"
+        )
+
+
+async def _listen_settings_updates(redis: Redis) -> None:
+    """Сбрасывает кеш настроек по уведомлениям других реплик."""
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(SETTINGS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    instance_id, group_id = data.split(":", 1)
+                    if instance_id == INSTANCE_ID:
+                        continue
+
+                    settings_cache.pop(int(group_id))
+                    logger.info(f"[Настройки] Кеш настроек форума {group_id} сброшен")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Настройки] Ошибка подписки на изменения настроек: {e}")
+            await asyncio.sleep(5)
+
+
+@track_repo_methods("settings")
+class CachedSettingsRepo:
+    """Обертка над репозиторием настроек форумов с кешем в памяти.
+
+    Изменение настроек через update_setting сразу обновляет кеш
+    и уведомляет остальные реплики.
+    """
+
+    def __init__(self, owner) -> None:
+        self._owner = owner
+
+    @property
+    def _repo(self):
+        return self._owner.requests_repo.settings
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return track_repo_attr(getattr(self._repo, name), f"settings.{name}")
+
+    async def get_settings_by_group_id(self, group_id: int | str):
+        group_id = int(group_id)
+
+        settings = settings_cache.get(group_id)
+        if settings is not MISSING:
+            return settings
+
+        settings = snapshot(
+            await self._repo.get_settings_by_group_id(group_id=group_id)
+        )
+        if settings is not None:
+            settings_cache.set(group_id, settings)
+        return settings
+
+    async def update_setting(self, group_id: int | str, key: str, value):
+        group_id = int(group_id)
+
+        result = await self._repo.update_setting(
+            group_id=group_id, key=key, value=value
+        )
+
+        settings = snapshot(
+            await self._repo.get_settings_by_group_id(group_id=group_id)
+        )
+        if settings is not None:
+            settings_cache.set(group_id, settings)
+        else:
+            settings_cache.pop(group_id)
+
+        await _publish_settings_update(group_id)
+        return result
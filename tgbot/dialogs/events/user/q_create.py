@@ -7,9 +7,9 @@ import validators
 from aiogram.types import CallbackQuery, Message
 from aiogram_dialog import DialogManager, ShowMode
 from stp_database.models.STP import Employee
-from stp_database.repo.Questions.requests import QuestionsRequestsRepo
 from stp_database.repo.STP import MainRequestsRepo
 
+from tgbot.database import ROLE_EMPLOYEE, QuestionerRepo, get_question_counts
 from tgbot.dialogs.states.user.main import QuestionSG
 from tgbot.keyboards.user.main import activity_status_toggle_kb, cancel_question_kb
 from tgbot.misc.helpers import (
@@ -18,7 +18,6 @@ from tgbot.misc.helpers import (
     get_target_forum,
     short_name,
 )
-from tgbot.services.scheduler import start_attention_reminder
 
 
 async def start_question_dialog(
@@ -47,9 +46,7 @@ async def on_message_input(
 
     # Получаем пользователя и настройки группы
     user: Employee = dialog_manager.middleware_data["user"]
-    questions_repo: QuestionsRequestsRepo = dialog_manager.middleware_data[
-        "questions_repo"
-    ]
+    questions_repo: QuestionerRepo = dialog_manager.middleware_data["questions_repo"]
 
     # Получаем настройки группы для проверки ask_clever_link
     target_forum_id = await get_target_forum(user)
@@ -196,16 +193,13 @@ async def create_question(
     """
     # Получаем данные из контекста
     user: Employee = dialog_manager.middleware_data["user"]
-    questions_repo: QuestionsRequestsRepo = dialog_manager.middleware_data[
-        "questions_repo"
-    ]
+    questions_repo: QuestionerRepo = dialog_manager.middleware_data["questions_repo"]
     stp_repo: MainRequestsRepo = dialog_manager.middleware_data["stp_repo"]
 
     head = await stp_repo.employee.get_users(fullname=user.head)
 
     # Проверяем активные вопросы
-    active_questions = await questions_repo.questions.get_active_questions()
-    if user.user_id in [q.employee_userid for q in active_questions]:
+    if await questions_repo.questions.get_active_question(employee_userid=user.user_id):
         answer_text = "У тебя уже есть активный вопрос"
         if isinstance(event, CallbackQuery):
             await event.answer(answer_text)
@@ -229,13 +223,8 @@ async def create_question(
         return
 
     # Получаем статистику пользователя
-    employee_topics_today = await questions_repo.questions.get_questions_count_today(
-        employee_userid=user.user_id
-    )
-    employee_topics_month = (
-        await questions_repo.questions.get_questions_count_last_month(
-            employee_userid=user.user_id
-        )
+    employee_topics_today, employee_topics_month = await get_question_counts(
+        ROLE_EMPLOYEE, user.user_id
     )
 
     # Получаем настройки группы
@@ -321,9 +310,6 @@ async def create_question(
             disable_notification=True,
         )
 
-        # Запускаем напоминание
-        await start_attention_reminder(new_question.token, questions_repo)
-
         logging.debug(
             f"[Dialog] {event.from_user.username} ({event.from_user.id}): Создан новый вопрос {new_question.token}"
         )
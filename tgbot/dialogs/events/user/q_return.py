@@ -53,22 +53,25 @@ async def on_confirm_return(
     )
     user: Employee = dialog_manager.middleware_data.get("user")
 
-    question: Question = await questions_repo.questions.get_question(
-        token=question_token
-    )
-    active_questions = await questions_repo.questions.get_active_questions()
-
-    if user.user_id in [q.employee_userid for q in active_questions]:
+    if await questions_repo.questions.has_active_question(user.user_id):
         await event.answer("У тебя есть другой открытый вопрос", show_alert=True)
         return
 
-    if question.status != "closed":
-        await event.answer("Этот вопрос не закрыт", show_alert=True)
+    question: Question = await questions_repo.questions.get_returnable_question(
+        token=question_token, employee_userid=user.user_id
+    )
+    if question is None:
+        question = await questions_repo.questions.get_question(token=question_token)
+        if question is None or question.status != "closed":
+            await event.answer("Этот вопрос не закрыт", show_alert=True)
+        elif not question.allow_return:
+            await event.answer("Возврат вопроса заблокирован", show_alert=True)
+        else:
+            await event.answer(
+                "Вопрос не переоткрыть. Прошло более 24 часов", show_alert=True
+            )
         return
 
-    if not question.allow_return:
-        await event.answer("Возврат вопроса заблокирован", show_alert=True)
-
     group_settings = await questions_repo.settings.get_settings_by_group_id(
         group_id=question.group_id,
     )
@@ -1,19 +1,14 @@
 from stp_database.models.STP import Employee
-from stp_database.repo.Questions import QuestionsRequestsRepo
+
+from tgbot.database import ROLE_EMPLOYEE, get_question_counts
 
 
 async def menu_getter(
     user: Employee,
-    questions_repo: QuestionsRequestsRepo,
     **_kwargs,
 ):
-    questions_count_day = await questions_repo.questions.get_questions_count_today(
-        employee_userid=user.user_id
-    )
-    questions_count_month = (
-        await questions_repo.questions.get_questions_count_last_month(
-            employee_userid=user.fullname
-        )
+    questions_count_day, questions_count_month = await get_question_counts(
+        ROLE_EMPLOYEE, user.user_id
     )
 
     return {
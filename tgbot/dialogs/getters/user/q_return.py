@@ -1,5 +1,4 @@
 from aiogram_dialog import DialogManager
-from stp_database.models.Questions import Question
 from stp_database.models.STP import Employee
 from stp_database.repo.Questions import QuestionsRequestsRepo
 from stp_database.repo.STP import MainRequestsRepo
@@ -36,20 +35,13 @@ async def confirmation_getter(
     """Получение данных для окна подтверждения возврата вопроса."""
     question_token = dialog_manager.dialog_data.get("question_token")
 
-    # Получаем все доступные вопросы для возврата
-    return_questions = (
-        await questions_repo.questions.get_available_to_return_questions()
+    # Выбранный вопрос, если его все еще можно вернуть
+    selected_question = await questions_repo.questions.get_returnable_question(
+        token=str(question_token), employee_userid=user.user_id
     )
-
-    # Находим выбранный вопрос
-    selected_question = None
-    for question in return_questions:
-        if (
-            str(question.token) == str(question_token)
-            and question.employee_userid == user.user_id
-        ):
-            selected_question: Question = question
-            break
+    if selected_question is None:
+        # Вопрос не найден или окно возврата закрылось, пока был открыт диалог
+        return {"question": None}
 
     duty = await stp_repo.employee.get_users(user_id=selected_question.duty_userid)
     regulation = (
@@ -60,10 +52,10 @@ async def confirmation_getter(
 
     return {
         "question": selected_question,
-        "text": selected_question.question_text if selected_question else "",
+        "text": selected_question.question_text,
         "duty": format_fullname(duty, True, True),
         "regulation": regulation,
         "start_time": selected_question.start_time.strftime("%d.%m.%Y %H:%M"),
         "end_time": selected_question.end_time.strftime("%d.%m.%Y %H:%M"),
-        "token": selected_question.token if selected_question else "",
+        "token": selected_question.token,
     }
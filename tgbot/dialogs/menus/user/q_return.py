@@ -66,7 +66,7 @@ confirmation_window = Window(
     Const(
         """❌ <b>Ошибка</b>
 
-Вопрос не найден""",
+Вопрос не найден или его больше нельзя вернуть""",
         when=~F["question"],
     ),
     Button(
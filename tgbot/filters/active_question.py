@@ -2,16 +2,16 @@ import logging
 
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
-from sqlalchemy import Sequence
 from stp_database.models.Questions import Question
-from stp_database.repo.Questions import QuestionsRequestsRepo
+
+from tgbot.database import QuestionerRepo
 
 logger = logging.getLogger(__name__)
 
 
 class ActiveQuestion(BaseFilter):
     async def __call__(
-        self, obj: Message, questions_repo: QuestionsRequestsRepo, **_kwargs
+        self, obj: Message, questions_repo: QuestionerRepo, **_kwargs
     ) -> bool | dict[str, Question]:
         """Filter to check if user has an active question
         ONLY works in private chats, not in groups
@@ -23,13 +23,14 @@ class ActiveQuestion(BaseFilter):
         if obj.chat.type != "private":
             return False
 
-        active_questions = await questions_repo.questions.get_active_questions()
+        question = await questions_repo.questions.get_active_question(
+            employee_userid=obj.from_user.id
+        )
 
-        for question in active_questions:
-            if question.employee_userid == obj.from_user.id:
-                return {
-                    "question": question,
-                }
+        if question:
+            return {
+                "question": question,
+            }
 
         logger.debug(
             f"[Активные вопросы] Не найдено активных вопросов у специалиста {obj.from_user.id}"
@@ -42,7 +43,7 @@ class ActiveQuestionWithCommand(BaseFilter):
         self.command = command
 
     async def __call__(
-        self, obj: Message, questions_repo: QuestionsRequestsRepo, **_kwargs
+        self, obj: Message, questions_repo: QuestionerRepo, **_kwargs
     ) -> bool | dict[str, Question] | None:
         if self.command:
             if obj.chat.type != "private":
@@ -51,13 +52,12 @@ class ActiveQuestionWithCommand(BaseFilter):
             if not obj.text or not obj.text.startswith(f"/{self.command}"):
                 return False
 
-            current_questions: Sequence[
-                Question
-            ] = await questions_repo.questions.get_active_questions()
+            question = await questions_repo.questions.get_active_question(
+                employee_userid=obj.from_user.id
+            )
 
-            for question in current_questions:
-                if question.employee_userid == obj.from_user.id:
-                    return {"question": question}
+            if question:
+                return {"question": question}
 
             return False
         logger.info(
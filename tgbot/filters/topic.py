@@ -3,9 +3,7 @@ import logging
 from aiogram.filters import BaseFilter
 from aiogram.types import Message
 
-from tgbot.config import load_config
-
-config = load_config(".env")
+from tgbot.config import get_config
 
 logger = logging.getLogger(__name__)
 
@@ -53,11 +51,12 @@ def _is_valid_user_message(message: Message) -> bool:
 def _is_main_topic(message: Message) -> bool:
     """Проверяет, находится ли сообщение в главном топике форума."""
     chat_id_str = str(message.chat.id)
+    forum = get_config().forum
     main_forum_ids = [
-        config.forum.ntp_main_forum_id,
-        config.forum.ntp_trainee_forum_id,
-        config.forum.nck_main_forum_id,
-        config.forum.nck_trainee_forum_id,
+        forum.ntp_main_forum_id,
+        forum.ntp_trainee_forum_id,
+        forum.nck_main_forum_id,
+        forum.nck_trainee_forum_id,
     ]
     return chat_id_str in main_forum_ids and message.message_thread_id is None
 
@@ -1,15 +1,19 @@
+import html
 import logging
 
 from aiogram import F, Router
-from aiogram.filters import CommandStart
+from aiogram.filters import Command, CommandStart
 from aiogram.types import Message
 from aiogram_dialog import DialogManager, StartMode
 from aiogram_dialog.api.exceptions import NoContextError
 
+from tgbot.config import get_config, reload_config
+from tgbot.database import QuestionerRepo, rebuild_counters
 from tgbot.dialogs.states.admin.main import AdminSG
 from tgbot.filters.admin import AdminFilter
+from tgbot.services.scheduler import reschedule_attention_reminders
 
-admin_router = Router()
+admin_router = Router(name="admin")
 admin_router.message.filter(AdminFilter())
 admin_router.message.filter(F.chat.type == "private")
 admin_router.callback_query.filter(F.message.chat.type == "private")
@@ -28,3 +32,48 @@ async def admin_start(
         logger.debug("No active dialog to finish on /start: %s", exc)
 
     await dialog_manager.start(AdminSG.menu, mode=StartMode.RESET_STACK)
+
+
+@admin_router.message(Command("rebuild_counters"))
+async def admin_rebuild_counters(
+    message: Message,
+    questions_repo: QuestionerRepo,
+) -> None:
+    """Пересчитывает счетчики вопросов за текущий месяц по базе."""
+    try:
+        questions_count = await rebuild_counters(questions_repo)
+    except Exception as e:
+        logger.error(f"[Счетчики] Ошибка пересчета: {e}")
+        await message.answer("❌ Не удалось пересчитать счетчики вопросов")
+        return
+
+    await message.answer(
+        f"✅ Счетчики вопросов пересчитаны\n\nУчтено вопросов: {questions_count}"
+    )
+
+
+@admin_router.message(Command("reload_config"))
+async def admin_reload_config(message: Message) -> None:
+    """Перечитывает настройки вопросника из файла env без перезапуска."""
+    try:
+        changed = reload_config()
+        if changed:
+            reschedule_attention_reminders()
+    except FileNotFoundError as e:
+        logger.error(f"[Конфиг] Файл настроек не найден: {e}")
+        await message.answer(
+            f"❌ Файл настроек <code>{html.escape(str(e))}</code> не найден"
+        )
+        return
+    except Exception as e:
+        logger.error(f"[Конфиг] Ошибка перезагрузки настроек: {e}")
+        await message.answer("❌ Не удалось перезагрузить настройки")
+        return
+
+    questioner_config = get_config().questioner
+    await message.answer(
+        f"""{"✅ Настройки вопросника перезагружены" if changed else "ℹ️ Настройки вопросника не изменились"}
+
+Напоминание без дежурного: через {questioner_config.attention_reminder_minutes} мин.
+Сводка напоминаний: {"да" if questioner_config.attention_digest else "нет"}"""
+    )
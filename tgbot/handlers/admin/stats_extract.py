@@ -1,10 +1,11 @@
+import datetime
+import html
 import logging
-from io import BytesIO
 
-import pandas as pd
 from aiogram import F, Router
-from aiogram.types import BufferedInputFile, CallbackQuery
-from numpy.random.mtrand import Sequence
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, FSInputFile, Message
+from sqlalchemy import Row
 from stp_database.repo.Questions import QuestionsRequestsRepo
 from stp_database.repo.STP import MainRequestsRepo
 
@@ -15,14 +16,41 @@ from tgbot.keyboards.admin.stats_extract import (
     MonthStatsExtract,
     division_selection_kb,
     extract_kb,
+    range_help_kb,
+)
+from tgbot.services.export_cache import (
+    CachedExport,
+    cache_export,
+    get_cached_export,
+)
+from tgbot.services.stats_export import (
+    EXPORT_FORMATS,
+    ExportRowsFile,
+    build_export_in_process,
+    remove_file,
 )
 
-stats_router = Router()
+stats_router = Router(name="admin_stats")
 stats_router.message.filter(AdminFilter())
 stats_router.callback_query.filter(AdminFilter())
 
 logger = logging.getLogger(__name__)
 
+# Сколько вопросов загружать из базы за один запрос
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_DIVISIONS = ("НЦК", "НТП", "ВСЕ")
+
+EXPORT_RANGE_HELP = f"""<b>🗓 Выгрузка за произвольный период</b>
+
+Отправь команду:
+<code>/export ДД.ММ.ГГГГ ДД.ММ.ГГГГ [направление] [формат]</code>
+
+Направление: {", ".join(EXPORT_DIVISIONS)}, по умолчанию ВСЕ
+Формат: {", ".join(EXPORT_FORMATS)}, по умолчанию xlsx
+
+<i>Например: /export 01.01.2025 31.03.2025 НЦК csv</i>"""
+
 
 @stats_router.callback_query(AdminMenu.filter(F.menu == "stats_extract"))
 async def extract_stats(callback: CallbackQuery) -> None:
@@ -100,137 +128,297 @@ async def admin_extract_division(
         11: "ноябрь",
         12: "декабрь",
     }
+    period = f"{month_names[month]} {year}"
 
-    # Отправляем сообщение о начале обработки
-    await callback.message.edit_text(
-        f"""<b>📥 Выгрузка статистики</b>
+    await callback.answer()
 
-Период: <b>{month_names[month]} {year}</b>
-Направление: <b>{division}</b>
+    header = f"""<b>📥 Выгрузка статистики</b>
 
-⏳ Обрабатываю данные, это может занять некоторое время..."""
-    )
+Период: <b>{period}</b>
+Направление: <b>{division}</b>"""
 
-    # Получаем все вопросы за месяц
-    questions: Sequence = await questions_repo.questions.get_questions_by_month(
-        month=month, year=year
+    # Выгрузка за завершенный месяц уже отправлялась - пересылаем тот же файл
+    cached_export = await get_cached_export(year, month, division)
+    if cached_export is not None:
+        await callback.message.answer_document(
+            cached_export.file_id,
+            caption=_export_caption(division, period, cached_export.questions_count),
+        )
+        await _finish_export(callback.message, header)
+        return
+
+    period_start = datetime.datetime(year, month, 1)
+    period_end = (
+        datetime.datetime(year + 1, 1, 1)
+        if month == 12
+        else datetime.datetime(year, month + 1, 1)
     )
 
-    # Собираем все уникальные user_id для батчевого запроса
-    employee_ids = set()
-    duty_ids = set()
-    for question in questions:
-        employee_ids.add(question.employee_userid)
-        if question.duty_userid:
-            duty_ids.add(question.duty_userid)
-
-    # Батчево получаем всех сотрудников и дежурных
-    logger.info(
-        f"Fetching employee data for {len(employee_ids)} employees and {len(duty_ids)} duty users"
+    result = await _export_questions(
+        status_message=callback.message,
+        header=header,
+        questions_repo=questions_repo,
+        stp_repo=stp_repo,
+        start=period_start,
+        end=period_end,
+        division=division,
+        period=period,
+        sheet_name=f"{division} - {month}_{year}",
+        export_format="xlsx",
     )
-    all_employees = await stp_repo.employee.get_users()
-    logger.info(f"Retrieved {len(all_employees)} total employees from database")
-
-    # Создаем словари для быстрого поиска
-    employees_dict = {emp.user_id: emp for emp in all_employees if emp.user_id}
-    logger.info(f"Created lookup dictionary with {len(employees_dict)} employees")
-
-    # Подготавливаем данные для Excel
-    data = []
-    processed_count = 0
-    for question in questions:
-        processed_count += 1
-        if processed_count % 1000 == 0:
-            logger.info(f"Processed {processed_count}/{len(questions)} questions")
-        # Получаем данные из словарей
-        employee = employees_dict.get(question.employee_userid)
-        duty = (
-            employees_dict.get(question.duty_userid) if question.duty_userid else None
+    if result is None:
+        return
+
+    questions_count, file_ids = result
+    if len(file_ids) == 1:
+        await cache_export(
+            year,
+            month,
+            division,
+            CachedExport(file_id=file_ids[0], questions_count=questions_count),
         )
+    await _finish_export(callback.message, header)
+
 
-        # Применяем фильтр по направлению
-        if division and division != "ВСЕ" and employee and employee.division:
-            if division.upper() not in employee.division.upper():
-                continue
-
-        # Определяем статус чата
-        if question.status == "open":
-            status = "Открыт"
-        elif question.status == "in_progress":
-            status = "В работе"
-        elif question.status == "closed":
-            status = "Закрыт"
+@stats_router.callback_query(AdminMenu.filter(F.menu == "stats_range"))
+async def extract_stats_range(callback: CallbackQuery) -> None:
+    await callback.message.edit_text(EXPORT_RANGE_HELP, reply_markup=range_help_kb())
+    await callback.answer()
+
+
+@stats_router.message(Command("export"))
+async def admin_extract_range(
+    message: Message,
+    command: CommandObject,
+    questions_repo: QuestionsRequestsRepo,
+    stp_repo: MainRequestsRepo,
+) -> None:
+    """Выгрузка статистики за произвольный период"""
+    try:
+        first_day, last_day, division, export_format = _parse_range_args(command.args)
+    except ValueError as e:
+        await message.answer(f"❌ {html.escape(str(e))}\n\n{EXPORT_RANGE_HELP}")
+        return
+
+    period = f"{first_day:%d.%m.%Y} - {last_day:%d.%m.%Y}"
+    header = f"""<b>📥 Выгрузка статистики</b>
+
+Период: <b>{period}</b>
+Направление: <b>{division}</b>
+Формат: <b>{export_format.upper()}</b>"""
+
+    status_message = await message.answer(header)
+    result = await _export_questions(
+        status_message=status_message,
+        header=header,
+        questions_repo=questions_repo,
+        stp_repo=stp_repo,
+        start=datetime.datetime.combine(first_day, datetime.time()),
+        end=datetime.datetime.combine(
+            last_day + datetime.timedelta(days=1), datetime.time()
+        ),
+        division=division,
+        period=period,
+        sheet_name=f"{division} {first_day:%d.%m.%y}-{last_day:%d.%m.%y}",
+        export_format=export_format,
+    )
+    if result is not None:
+        await _finish_export(status_message, header)
+
+
+def _parse_range_args(
+    args: str | None,
+) -> tuple[datetime.date, datetime.date, str, str]:
+    """Разбирает аргументы команды /export.
+
+    Returns:
+        Первый и последний день периода, направление и формат файла
+
+    Raises:
+        ValueError: Если аргументы указаны неверно
+    """
+    parts = (args or "").split()
+    if len(parts) < 2:
+        raise ValueError("Укажи начало и конец периода")
+
+    try:
+        first_day = datetime.datetime.strptime(parts[0], "%d.%m.%Y").date()
+        last_day = datetime.datetime.strptime(parts[1], "%d.%m.%Y").date()
+    except ValueError:
+        raise ValueError("Даты указываются в формате ДД.ММ.ГГГГ") from None
+    if first_day > last_day:
+        raise ValueError("Начало периода позже его конца")
+
+    division = "ВСЕ"
+    export_format = "xlsx"
+    for part in parts[2:]:
+        if part.lower() in EXPORT_FORMATS:
+            export_format = part.lower()
+        elif part.upper() in EXPORT_DIVISIONS:
+            division = part.upper()
         else:
-            status = question.status
+            raise ValueError(f"Непонятный параметр: {part}")
 
-        # Оценки качества
-        quality_employee = (
-            "Хорошо"
-            if question.quality_employee
-            else ("Плохо" if question.quality_employee is False else "")
-        )
-        quality_duty = (
-            "Хорошо"
-            if question.quality_duty
-            else ("Плохо" if question.quality_duty is False else "")
-        )
+    return first_day, last_day, division, export_format
+
+
+async def _export_questions(
+    status_message: Message,
+    header: str,
+    questions_repo: QuestionsRequestsRepo,
+    stp_repo: MainRequestsRepo,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    division: str,
+    period: str,
+    sheet_name: str,
+    export_format: str,
+) -> tuple[int, list[str]] | None:
+    """Выгружает вопросы за период и отправляет файлы в чат.
+
+    Прогресс показывается редактированием status_message.
+
+    Returns:
+        Количество вопросов и file_id отправленных файлов или None,
+        если вопросов нет или файл не удалось сформировать
+    """
+    # Отправляем сообщение о начале обработки
+    await status_message.edit_text(
+        f"""{header}
+
+⏳ Шаг 1/3: загружаю вопросы..."""
+    )
 
-        # Возможность возврата
-        allow_return = "Доступен" if question.allow_return else "Недоступен"
-
-        data.append({
-            "Токен": question.token,
-            "Дежурный": duty.fullname if duty else "Не назначен",
-            "Специалист": employee.fullname if employee else "Не найден",
-            "Направление": employee.division if employee else "Не указано",
-            "Вопрос": question.question_text,
-            "Время вопроса": question.start_time,
-            "Время завершения": question.end_time,
-            "Ссылка на БЗ": question.clever_link,
-            "Оценка специалиста": quality_employee,
-            "Оценка дежурного": quality_duty,
-            "Статус чата": status,
-            "Возврат": allow_return,
-        })
-
-    if not data:
-        await callback.message.edit_text(
-            f"""<b>📥 Выгрузка статистики</b>
-
-Не найдено вопросов для периода <b>{month_names[month]} {year}</b> и направления <b>{division}</b>
-
-Всего обработано вопросов: {len(questions)}
-
-Попробуй другой месяц или направление""",
-            reply_markup=extract_kb(),
+    # Сотрудники: user_id -> (user_id, fullname, division) или None, если не найден
+    employees: dict[int, Row | None] = {}
+    employee_userids = None
+    if division and division != "ВСЕ":
+        # Фильтр по направлению выполняется в базе: берем только вопросы
+        # специалистов выбранного направления
+        employees = {
+            employee.user_id: employee
+            for employee in await stp_repo.employee.get_employee_rows(division=division)
+        }
+        employee_userids = list(employees)
+        logger.info(f"Found {len(employee_userids)} employees of division {division}")
+
+    # Строки пишутся во временный файл пачками, целиком в памяти не хранятся
+    with ExportRowsFile() as rows_file:
+        processed_count = 0
+        async for chunk in questions_repo.questions.iter_export_rows(
+            start=start,
+            end=end,
+            employee_userids=employee_userids,
+            chunk_size=EXPORT_CHUNK_SIZE,
+        ):
+            # Догружаем только сотрудников, упомянутых в этой пачке
+            missing_ids = {
+                user_id
+                for question in chunk
+                for user_id in (question.employee_userid, question.duty_userid)
+                if user_id and user_id not in employees
+            }
+            if missing_ids:
+                employees.update(dict.fromkeys(missing_ids))
+                employees.update(
+                    (employee.user_id, employee)
+                    for employee in await stp_repo.employee.get_employee_rows(
+                        user_ids=missing_ids
+                    )
+                )
+
+            rows_file.write([_question_row(question, employees) for question in chunk])
+            processed_count += len(chunk)
+            if processed_count % (EXPORT_CHUNK_SIZE * 5) == 0:
+                logger.info(f"Processed {processed_count} questions")
+                await status_message.edit_text(
+                    f"""{header}
+
+⏳ Шаг 1/3: загружено вопросов: {processed_count}..."""
+                )
+        rows_file.close()
+
+        if not rows_file.count:
+            await status_message.edit_text(
+                f"""<b>📥 Выгрузка статистики</b>
+
+Не найдено вопросов для периода <b>{period}</b> и направления <b>{division}</b>
+
+Всего обработано вопросов: {processed_count}
+
+Попробуй другой период или направление""",
+                reply_markup=extract_kb(),
+            )
+            return None
+
+        await status_message.edit_text(
+            f"""{header}
+
+⏳ Шаг 2/3: формирую файл, вопросов: {rows_file.count}..."""
         )
-        await callback.answer()
-        return
 
-    # Создаем файл excel в памяти
-    df = pd.DataFrame(data)
-    excel_buffer = BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name=f"{division} - {month}_{year}", index=False)
+        # Файл собирается в отдельном процессе, бот продолжает обрабатывать чаты
+        try:
+            paths = await build_export_in_process(
+                rows_file.path, sheet_name=sheet_name, export_format=export_format
+            )
+        except Exception as e:
+            logger.error(f"[Выгрузка] Ошибка формирования файла: {e}")
+            await status_message.edit_text(
+                f"""{header}
+
+❌ Не удалось сформировать файл, попробуй еще раз""",
+                reply_markup=extract_kb(),
+            )
+            return None
+
+    await status_message.edit_text(
+        f"""{header}
+
+⏳ Шаг 3/3: отправляю файл..."""
+    )
+
+    file_ids = []
+    try:
+        for part, path in enumerate(paths, start=1):
+            # Создаем имя файла
+            part_suffix = f" (часть {part} из {len(paths)})" if len(paths) > 1 else ""
+            filename = (
+                f"История вопросов {division} - {period}{part_suffix}.{export_format}"
+            )
+
+            caption = _export_caption(division, period, rows_file.count)
+            if len(paths) > 1:
+                caption += f"\n🗂 Часть {part} из {len(paths)}"
+
+            sent_message = await status_message.answer_document(
+                FSInputFile(path, filename=filename), caption=caption
+            )
+            file_ids.append(sent_message.document.file_id)
+    finally:
+        for path in paths:
+            remove_file(path)
+
+    return rows_file.count, file_ids
+
 
-    excel_buffer.seek(0)
+def _export_caption(division: str, period: str, questions_count: int) -> str:
+    return f"""📊 <b>Статистика {division}</b>
 
-    # Создаем имя файла
-    filename = f"История вопросов {division} - {month_names[month]} {year}.xlsx"
+📅 Период: {period}
+📋 Количество вопросов: {questions_count}"""
 
-    # Сохраняем файл в буфер
-    excel_file = BufferedInputFile(excel_buffer.getvalue(), filename=filename)
 
-    await callback.message.answer_document(
-        excel_file,
-        caption=f"""📊 <b>Статистика {division}</b>
+async def _finish_export(status_message: Message, header: str) -> None:
+    """Отмечает выгрузку готовой и возвращает меню статистики."""
+    await status_message.edit_text(
+        f"""{header}
 
-📅 Период: {month_names[month]} {year}
-📋 Количество вопросов: {len(data)}""",
+✅ Выгрузка готова"""
     )
 
     # Возвращаемся к главному меню статистики
-    await callback.message.answer(
+    await status_message.answer(
         """<b>📥 Выгрузка статистики</b>
 
 Универсальная выгрузка для обоих направлений
@@ -239,4 +427,48 @@ async def admin_extract_division(
         reply_markup=extract_kb(),
     )
 
-    await callback.answer()
+
+def _question_row(question: Row, employees: dict[int, Row | None]) -> tuple:
+    """Формирует строку выгрузки в порядке EXPORT_COLUMNS."""
+    employee = employees.get(question.employee_userid)
+    duty = employees.get(question.duty_userid) if question.duty_userid else None
+
+    # Определяем статус чата
+    if question.status == "open":
+        status = "Открыт"
+    elif question.status == "in_progress":
+        status = "В работе"
+    elif question.status == "closed":
+        status = "Закрыт"
+    else:
+        status = question.status
+
+    # Оценки качества
+    quality_employee = (
+        "Хорошо"
+        if question.quality_employee
+        else ("Плохо" if question.quality_employee is False else "")
+    )
+    quality_duty = (
+        "Хорошо"
+        if question.quality_duty
+        else ("Плохо" if question.quality_duty is False else "")
+    )
+
+    # Возможность возврата
+    allow_return = "Доступен" if question.allow_return else "Недоступен"
+
+    return (
+        question.token,
+        duty.fullname if duty else "Не назначен",
+        employee.fullname if employee else "Не найден",
+        employee.division if employee else "Не указано",
+        question.question_text,
+        question.start_time,
+        question.end_time,
+        question.clever_link,
+        quality_employee,
+        quality_duty,
+        status,
+        allow_return,
+    )
@@ -18,6 +18,7 @@ from stp_database.models.STP import Employee
 from stp_database.repo.Questions import QuestionsRequestsRepo
 from stp_database.repo.STP import MainRequestsRepo
 
+from tgbot.database import ROLE_DUTY, get_question_counts
 from tgbot.filters.topic import IsTopicMessage
 from tgbot.handlers.group.topic_cmds import end_q_cmd
 from tgbot.keyboards.group.main import (
@@ -33,14 +34,14 @@ from tgbot.keyboards.user.main import (
 )
 from tgbot.middlewares.MessagePairingMiddleware import store_message_connection
 from tgbot.misc.helpers import check_premium_emoji, format_fullname, short_name
+from tgbot.services.request_scheduler import Priority, set_request_priority
 from tgbot.services.scheduler import (
     restart_inactivity_timer,
     run_delete_timer,
     start_inactivity_timer,
-    stop_attention_reminder,
 )
 
-topic_router = Router()
+topic_router = Router(name="group_topic")
 
 logger = logging.getLogger(__name__)
 
@@ -52,10 +53,15 @@ async def handle_q_message(
     questions_repo: QuestionsRequestsRepo,
     stp_repo: MainRequestsRepo,
 ):
+    set_request_priority(Priority.RELAY)
+
     question = await questions_repo.questions.get_question(
         group_id=message.chat.id, topic_id=message.message_thread_id
     )
 
+    if not question:
+        return
+
     employee = await stp_repo.employee.get_users(user_id=question.employee_userid)
 
     if message.message_thread_id != question.topic_id:
@@ -87,15 +93,8 @@ async def handle_q_message(
         if not question.duty_userid and "".join(
             c for c in employee.division if c.isalpha()
         ) == "".join(c for c in user.division if c.isalpha()):
-            duty_topics_today = (
-                await questions_repo.questions.get_questions_count_today(
-                    duty_userid=user.user_id
-                )
-            )
-            duty_topics_month = (
-                await questions_repo.questions.get_questions_count_last_month(
-                    duty_userid=str(user.user_id)
-                )
+            duty_topics_today, duty_topics_month = await get_question_counts(
+                ROLE_DUTY, user.user_id
             )
 
             await questions_repo.questions.update_question(
@@ -103,7 +102,6 @@ async def handle_q_message(
                 duty_userid=user.user_id,
                 status="in_progress",
             )
-            stop_attention_reminder(question.token)
 
             # Запускаем таймер бездействия для нового вопроса
             if question.activity_status_enabled:
@@ -185,7 +183,7 @@ async def handle_q_message(
             if question.duty_userid == user.user_id:
                 # Перезапускаем таймер бездействия при сообщении от дежурного
                 await restart_inactivity_timer(
-                    question_token=question.token,
+                    question=question,
                     questions_repo=questions_repo,
                 )
 
@@ -291,6 +289,8 @@ async def handle_edited_message(
     message: Message, questions_repo: QuestionsRequestsRepo, user: Employee
 ):
     """Универсальных хендлер для редактируемых сообщений в топиках"""
+    set_request_priority(Priority.RELAY)
+
     question: Question = await questions_repo.questions.get_question(
         group_id=message.chat.id, topic_id=message.message_thread_id
     )
@@ -421,16 +421,15 @@ async def return_q_duty(
         group_id=question.group_id,
     )
 
-    available_to_return_questions = (
-        await questions_repo.questions.get_available_to_return_questions()
+    returnable = await questions_repo.questions.is_returnable(question.token)
+    employee_busy = await questions_repo.questions.has_active_question(
+        question.employee_userid
     )
-    active_questions = await questions_repo.questions.get_active_questions()
 
     if (
         question.status == "closed"
-        and question.employee_userid
-        not in [u.employee_userid for u in active_questions]
-        and question.token in [d.token for d in available_to_return_questions]
+        and not employee_busy
+        and returnable
         and (question.duty_userid == user.user_id or question.duty_userid is None)
     ):
         await questions_repo.questions.update_question(
@@ -471,14 +470,14 @@ async def return_q_duty(
         logger.warning(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Неудачная попытка переоткрытия, вопрос {question.token} принадлежит другому старшему"
         )
-    elif question.employee_userid in [d.employee_userid for d in active_questions]:
+    elif employee_busy:
         await callback.answer(
             "У специалиста есть другой открытый вопрос", show_alert=True
         )
         logger.error(
             f"[Вопрос] - [Переоткрытие] Пользователь {callback.from_user.username} ({callback.from_user.id}): Неудачная попытка переоткрытия, у специалиста {question.employee_userid} есть другой открытый вопрос"
         )
-    elif question.token not in [d.token for d in available_to_return_questions]:
+    elif not returnable:
         await callback.answer(
             "Вопрос не переоткрыть. Прошло более 24 часов или возврат заблокирован",
             show_alert=True,
@@ -600,7 +599,7 @@ async def toggle_activity_status(
             action_text = "отключен"
             from tgbot.services.scheduler import stop_inactivity_timer
 
-            stop_inactivity_timer(question.token)
+            await stop_inactivity_timer(question.token)
 
         # Обновляем статус в базе данных
         await questions_repo.questions.update_question(
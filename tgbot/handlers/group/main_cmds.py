@@ -1,13 +1,24 @@
 import logging
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command, CommandObject
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import (
+    CallbackQuery,
+    InaccessibleMessage,
+    InlineKeyboardMarkup,
+    Message,
+)
 from stp_database.models.STP import Employee
 from stp_database.repo.Questions import QuestionsRequestsRepo
 from stp_database.repo.STP import MainRequestsRepo
 
 from tgbot.filters.topic import IsMainTopicMessageWithCommand
+from tgbot.keyboards.group.main import (
+    ACTIVE_PAGE_SIZE,
+    ActiveQuestionsPage,
+    active_questions_kb,
+)
 from tgbot.keyboards.group.settings import (
     SettingsEmoji,
     SettingsEmojiPage,
@@ -15,7 +26,7 @@ from tgbot.keyboards.group.settings import (
 )
 from tgbot.misc.helpers import format_fullname
 
-main_topic_cmds_router = Router()
+main_topic_cmds_router = Router(name="group_main_cmds")
 
 logger = logging.getLogger(__name__)
 
@@ -68,61 +79,108 @@ async def question_info(
     await message.reply(response, disable_web_page_preview=True)
 
 
-@main_topic_cmds_router.message(Command("active"), IsMainTopicMessageWithCommand())
-async def active_questions_cmd(
-    message: Message,
+async def _active_questions_page(
+    group_id: int,
     questions_repo: QuestionsRequestsRepo,
-    main_repo: MainRequestsRepo,
-):
-    """Получение всех активных вопросов в группе (статус != 'closed')."""
-    # Получаем все вопросы в работе
-    all_questions = await questions_repo.questions.get_questions(
-        group_id=message.chat.id, status="in_progress"
+    stp_repo: MainRequestsRepo,
+    after: str = "",
+    number: int = 1,
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    """Формирует страницу списка вопросов в работе.
+
+    Args:
+        group_id: Идентификатор форума
+        questions_repo: Репозиторий вопросов
+        stp_repo: Репозиторий основной базы СТП
+        after: Токен последнего вопроса предыдущей страницы
+        number: Порядковый номер первого вопроса страницы
+
+    Returns:
+        Текст страницы и клавиатура навигации
+    """
+    # Лишний вопрос показывает, есть ли следующая страница
+    questions = await questions_repo.questions.get_in_progress_page(
+        group_id=group_id, after_token=after or None, limit=ACTIVE_PAGE_SIZE + 1
+    )
+    has_next = len(questions) > ACTIVE_PAGE_SIZE
+    questions = questions[:ACTIVE_PAGE_SIZE]
+
+    if not questions:
+        if after:
+            return "Больше активных вопросов нет", active_questions_kb(number, None)
+        return "В данной группе нет активных вопросов", None
+
+    # Сотрудники всей страницы загружаются одним запросом
+    employees = await stp_repo.employee.get_users_by_ids(
+        user_id
+        for question in questions
+        for user_id in (question.duty_userid, question.employee_userid)
     )
 
-    if not all_questions:
-        await message.reply("В данной группе нет активных вопросов")
-        return
+    def employee_name(user_id: int | None) -> str:
+        employee = employees.get(user_id)
+        return format_fullname(employee, True, True) if employee else "Неизвестно"
 
     response_parts = ["<b>📋 Активные вопросы в группе:</b>\n"]
+    for i, question in enumerate(questions, number):
+        response_parts.append(
+            f"🔹 <b>{i}.</b> <a href='t.me/c/{str(question.group_id)[4:]}/{question.topic_id}'>{question.token}</a>\n"
+            f"<b>Дежурный:</b> {employee_name(question.duty_userid)}\n"
+            f"<b>Специалист:</b> {employee_name(question.employee_userid)}\n"
+        )
 
-    for i, question in enumerate(all_questions, 1):
-        try:
-            duty = await main_repo.employee.get_users(user_id=question.duty_userid)
-            employee = await main_repo.employee.get_users(
-                user_id=question.employee_userid
-            )
+    next_token = questions[-1].token if has_next else None
+    return "\n".join(response_parts), active_questions_kb(number, next_token)
 
-            # Определяем статус эмодзи
-            status_emoji = "🔸"
-            if question.status == "in_progress":
-                status_emoji = "🔹"
-            elif question.status == "open":
-                status_emoji = "🔸"
-
-            duty_name = format_fullname(duty, True, True)
-            employee_name = format_fullname(employee, True, True)
-            response_parts.append(
-                f"{status_emoji} <b>{i}.</b> <a href='t.me/c/{str(question.group_id)[4:]}/{question.topic_id}'>{question.token}</a>\n"
-                f"<b>Дежурный:</b> {duty_name}\n"
-                f"<b>Специалист:</b> {employee_name}\n\n"
-            )
-        except Exception as e:
-            logger.error(f"Ошибка при обработке вопроса {question.token}: {e}")
-            response_parts.append(
-                f"❌ <b>{i}.</b> <code>{question.token}</code> - ошибка загрузки данных\n"
-            )
 
-    response = "\n".join(response_parts)
+@main_topic_cmds_router.message(Command("active"), IsMainTopicMessageWithCommand())
+async def active_questions_cmd(
+    message: Message,
+    questions_repo: QuestionsRequestsRepo,
+    stp_repo: MainRequestsRepo,
+):
+    """Получение вопросов в работе в группе, по странице за раз."""
+    response, keyboard = await _active_questions_page(
+        message.chat.id, questions_repo, stp_repo
+    )
+    await message.reply(
+        response,
+        parse_mode="HTML",
+        reply_markup=keyboard,
+        disable_web_page_preview=True,
+    )
+
 
-    # Если сообщение слишком длинное, разбиваем на части
-    if len(response) > 4000:
-        response = (
-            response[:4000]
-            + "\n\n<i>... список сокращен из-за ограничений Telegram</i>"
-        )
+@main_topic_cmds_router.callback_query(ActiveQuestionsPage.filter())
+async def active_questions_page(
+    callback: CallbackQuery,
+    callback_data: ActiveQuestionsPage,
+    questions_repo: QuestionsRequestsRepo,
+    stp_repo: MainRequestsRepo,
+):
+    """Переключение страницы списка вопросов в работе."""
+    if isinstance(callback.message, InaccessibleMessage):
+        await callback.answer("Сообщение устарело, вызови /active заново")
+        return
 
-    await message.reply(response, parse_mode="HTML", disable_web_page_preview=True)
+    response, keyboard = await _active_questions_page(
+        callback.message.chat.id,
+        questions_repo,
+        stp_repo,
+        after=callback_data.after,
+        number=callback_data.number,
+    )
+    try:
+        await callback.message.edit_text(
+            response,
+            parse_mode="HTML",
+            reply_markup=keyboard,
+            disable_web_page_preview=True,
+        )
+    except TelegramBadRequest as e:
+        # Например, повторное нажатие: message is not modified
+        logger.debug(f"[Активные вопросы] Не удалось обновить список: {e}")
+    await callback.answer()
 
 
 @main_topic_cmds_router.message(IsMainTopicMessageWithCommand("link"))
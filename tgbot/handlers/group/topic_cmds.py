@@ -16,11 +16,10 @@ from tgbot.keyboards.group.main import FinishedQuestion, question_finish_duty_kb
 from tgbot.keyboards.user.main import question_finish_employee_kb
 from tgbot.misc.helpers import format_fullname
 from tgbot.services.scheduler import (
-    start_attention_reminder,
     stop_inactivity_timer,
 )
 
-topic_cmds_router = Router()
+topic_cmds_router = Router(name="group_topic_cmds")
 
 logger = logging.getLogger(__name__)
 
@@ -31,10 +30,12 @@ async def end_q_cmd(
     user: Employee,
     questions_repo: QuestionsRequestsRepo,
     stp_repo: MainRequestsRepo,
+    question: Question | None = None,
 ):
-    question: Question = await questions_repo.questions.get_question(
-        group_id=message.chat.id, topic_id=message.message_thread_id
-    )
+    if question is None:
+        question = await questions_repo.questions.get_question(
+            group_id=message.chat.id, topic_id=message.message_thread_id
+        )
 
     if not question:
         await message.answer("""<b>⚠️ Предупреждение</b>
@@ -57,7 +58,7 @@ async def end_q_cmd(
         return
 
     # Останавливаем таймер бездействия
-    stop_inactivity_timer(question.token)
+    await stop_inactivity_timer(question.token)
 
     # Обновляем статус вопроса
     await questions_repo.questions.update_question(
@@ -178,9 +179,6 @@ async def release_q_cmd(
 Дежурный <b>{format_fullname(user, True, True)}</b> освободил вопрос. Ожидай повторного подключения дежурного""",
     )
 
-    # Запускаем таймер внимания
-    await start_attention_reminder(question.token, questions_repo)
-
 
 @topic_cmds_router.callback_query(FinishedQuestion.filter(F.action == "release"))
 async def release_q_cb(
@@ -218,6 +216,3 @@ async def release_q_cb(
         message_thread_id=question.topic_id,
         icon_custom_emoji_id=group_settings.get_setting("emoji_open"),
     )
-
-    # Запускаем таймер внимания
-    await start_attention_reminder(question.token, questions_repo)
@@ -19,7 +19,7 @@ from tgbot.services.scheduler import (
     remove_question_timer,
 )
 
-user_router = Router()
+user_router = Router(name="user")
 user_router.message.filter(F.chat.type == "private")
 user_router.callback_query.filter(F.message.chat.type == "private")
 
@@ -26,13 +26,14 @@ from tgbot.keyboards.user.main import (
 )
 from tgbot.middlewares.MessagePairingMiddleware import store_message_connection
 from tgbot.misc.helpers import check_premium_emoji, format_fullname, short_name
+from tgbot.services.request_scheduler import Priority, set_request_priority
 from tgbot.services.scheduler import (
     restart_inactivity_timer,
     run_delete_timer,
     stop_inactivity_timer,
 )
 
-user_q = Router()
+user_q = Router(name="user_q_active")
 user_q.message.filter(F.chat.type == "private")
 user_q.callback_query.filter(F.message.chat.type == "private")
 
@@ -59,7 +60,7 @@ async def active_question_end(
         return
 
     # Останавливаем таймер автозакрытия
-    stop_inactivity_timer(question.token)
+    await stop_inactivity_timer(question.token)
 
     # Обновляем статус
     await questions_repo.questions.update_question(
@@ -123,6 +124,8 @@ async def active_question(
     if message.message_thread_id:
         return
 
+    set_request_priority(Priority.RELAY)
+
     if message.voice or message.audio:
         await message.reply(
             """<b>⚠️ Голосовые сообщения недоступны</b>
@@ -141,9 +144,7 @@ async def active_question(
         return
 
     # Перезапускаем таймер бездействия при сообщении от пользователя
-    await restart_inactivity_timer(
-        question_token=question.token, questions_repo=questions_repo
-    )
+    await restart_inactivity_timer(question=question, questions_repo=questions_repo)
 
     # Если реплай - пробуем отправить ответом
     if message.reply_to_message:
@@ -231,6 +232,8 @@ async def handle_edited_message(
     question: Question,
 ) -> None:
     """Универсальный хендлер для редактируемых сообщений пользователей в активных вопросах"""
+    set_request_priority(Priority.RELAY)
+
     if not question:
         await message.answer("""⚠️ <b>Ошибка</b>
 
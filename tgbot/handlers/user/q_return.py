@@ -14,7 +14,7 @@ from tgbot.keyboards.user.main import (
 )
 from tgbot.misc.helpers import format_fullname, short_name
 
-user_q_return = Router()
+user_q_return = Router(name="user_q_return")
 user_q_return.message.filter(F.chat.type == "private")
 user_q_return.callback_query.filter(F.message.chat.type == "private")
 
@@ -30,23 +30,21 @@ async def q_return(
     user: Employee,
 ):
     """Возврат вопроса специалистом по клику на клавиатуру после закрытия вопроса."""
-    active_questions = await questions_repo.questions.get_active_questions()
-    question: Question = await questions_repo.questions.get_question(
-        token=callback_data.token
-    )
-    available_to_return_questions = (
-        await questions_repo.questions.get_available_to_return_questions()
-    )
-
-    if user.user_id in [d.employee_userid for d in active_questions]:
+    if await questions_repo.questions.has_active_question(user.user_id):
         await callback.answer("У тебя есть другой открытый вопрос", show_alert=True)
         return
 
-    if question.status != "closed":
-        await callback.answer("Этот вопрос не закрыт", show_alert=True)
-        return
+    question: Question = await questions_repo.questions.get_returnable_question(
+        token=callback_data.token, employee_userid=user.user_id
+    )
+    if question is None:
+        question = await questions_repo.questions.get_question(
+            token=callback_data.token
+        )
+        if question is None or question.status != "closed":
+            await callback.answer("Этот вопрос не закрыт", show_alert=True)
+            return
 
-    if question.token not in [q.token for q in available_to_return_questions]:
         await callback.answer(
             "Вопрос не переоткрыть. Прошло более 24 часов или возврат заблокирован",
             show_alert=True,
@@ -83,6 +83,13 @@ def extract_kb() -> InlineKeyboardMarkup:
 
         buttons.append(row)
 
+    buttons.append([
+        InlineKeyboardButton(
+            text="🗓 Произвольный период",
+            callback_data=AdminMenu(menu="stats_range").pack(),
+        ),
+    ])
+
     # Add back button
     buttons.append([
         InlineKeyboardButton(
@@ -135,3 +142,18 @@ def division_selection_kb(month: int, year: int) -> InlineKeyboardMarkup:
 
     keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
     return keyboard
+
+
+# Подсказка по выгрузке за произвольный период
+def range_help_kb() -> InlineKeyboardMarkup:
+    buttons = [
+        [
+            InlineKeyboardButton(
+                text="↩️ К выбору месяца",
+                callback_data=AdminMenu(menu="stats_extract").pack(),
+            ),
+        ],
+    ]
+
+    keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+    return keyboard
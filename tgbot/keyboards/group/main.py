@@ -2,6 +2,9 @@ from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from stp_database.models.Questions import Question
 
+# Количество вопросов на странице списка /active
+ACTIVE_PAGE_SIZE = 10
+
 
 class QuestionQualityDuty(CallbackData, prefix="q_quality_duty"):
     answer: bool = False
@@ -146,3 +149,43 @@ def closed_question_duty_kb(
         inline_keyboard=buttons,
     )
     return keyboard
+
+
+class ActiveQuestionsPage(CallbackData, prefix="active_q"):
+    after: str = ""
+    number: int = 1
+
+
+def active_questions_kb(
+    first_number: int, next_token: str | None
+) -> InlineKeyboardMarkup | None:
+    """Клавиатура постраничного списка активных вопросов.
+
+    :param first_number: Порядковый номер первого вопроса текущей страницы
+    :type first_number: int
+    :param next_token: Токен последнего вопроса страницы, если есть следующая
+    :type next_token: str | None
+    :return: Объект встроенной клавиатуры или None, если страница единственная
+    :rtype: InlineKeyboardMarkup | None
+    """
+    row = []
+    if first_number > 1:
+        row.append(
+            InlineKeyboardButton(
+                text="⏮️ В начало",
+                callback_data=ActiveQuestionsPage().pack(),
+            )
+        )
+    if next_token:
+        row.append(
+            InlineKeyboardButton(
+                text="➡️ Далее",
+                callback_data=ActiveQuestionsPage(
+                    after=next_token, number=first_number + ACTIVE_PAGE_SIZE
+                ).pack(),
+            )
+        )
+
+    if not row:
+        return None
+    return InlineKeyboardMarkup(inline_keyboard=[row])
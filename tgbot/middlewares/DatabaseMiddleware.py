@@ -4,10 +4,9 @@ from typing import Any, Awaitable, Callable
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import Message, TelegramObject
 from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError
-from stp_database.repo.Questions import QuestionsRequestsRepo
-from stp_database.repo.STP import MainRequestsRepo
 
 from tgbot.config import Config
+from tgbot.database import QuestionerRepo, StpRepo
 
 logger = logging.getLogger(__name__)
 
@@ -36,28 +35,23 @@ class DatabaseMiddleware(BaseMiddleware):
 
         while retry_count < max_retries:
             try:
-                # Use separate sessions for different databases
-                async with self.main_session_pool() as main_session:
-                    async with self.questioner_session_pool() as questioner_session:
-                        # Create repositories for different databases
-                        stp_repo = MainRequestsRepo(main_session)
-                        questioner_repo = QuestionsRequestsRepo(questioner_session)
-
-                        # Get user from database
-                        user = await stp_repo.employee.get_users(
-                            user_id=event.from_user.id
-                        )
-
-                        # Add repositories and user to data for other middlewares
-                        data["stp_repo"] = stp_repo
-                        data["main_session"] = main_session
-                        data["questioner_session"] = questioner_session
-                        data["questions_repo"] = questioner_repo
-                        data["user"] = user
-
-                        # Continue to the next middleware/handler
-                        result = await handler(event, data)
-                        return result
+                # Repositories open their sessions lazily on the first query
+                # and release them once the update is processed
+                async with (
+                    StpRepo(self.main_session_pool) as stp_repo,
+                    QuestionerRepo(self.questioner_session_pool) as questioner_repo,
+                ):
+                    # Get user from database
+                    user = await stp_repo.employee.get_users(user_id=event.from_user.id)
+
+                    # Add repositories and user to data for other middlewares
+                    data["stp_repo"] = stp_repo
+                    data["questions_repo"] = questioner_repo
+                    data["user"] = user
+
+                    # Continue to the next middleware/handler
+                    result = await handler(event, data)
+                    return result
 
             except (OperationalError, DBAPIError, DisconnectionError) as e:
                 logger.error(f"[DatabaseMiddleware] Critical database error: {e}")
@@ -0,0 +1,106 @@
+import time
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot, Router
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods.base import Response, TelegramMethod, TelegramType
+from aiogram.types import TelegramObject, Update
+
+from tgbot.services.metrics import (
+    handler_calls_total,
+    handler_duration,
+    telegram_errors_total,
+    telegram_request_duration,
+    update_duration,
+    updates_total,
+)
+
+# Наблюдатели роутера, на которые не вешается учет хендлеров
+SKIPPED_OBSERVERS = ("update", "error")
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Учитывает количество и полное время обработки апдейтов по типу.
+
+    Регистрируется как outer middleware на dp.update.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        event_type = event.event_type
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            updates_total.inc(event_type)
+            update_duration.observe(time.perf_counter() - started, event_type)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Учитывает вызовы и время работы хендлеров по роутеру.
+
+    Регистрируется как inner middleware на наблюдатели корневого роутера.
+    aiogram применяет inner middleware роутера и всех его предков к каждому
+    хендлеру, поэтому middleware срабатывает один раз и только для
+    апдейтов, нашедших свой хендлер.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        router = data.get("event_router")
+        router_name = router.name if router is not None else "unknown"
+        event_type = type(event).__name__
+
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await handler(event, data)
+            status = "ok"
+            return result
+        finally:
+            handler_calls_total.inc(router_name, event_type, status)
+            handler_duration.observe(
+                time.perf_counter() - started, router_name, event_type
+            )
+
+    def setup(self, root: Router) -> None:
+        """Подключает middleware к наблюдателям корневого роутера."""
+        for name, observer in root.observers.items():
+            if name not in SKIPPED_OBSERVERS:
+                observer.middleware(self)
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Учитывает время и ошибки вызовов Bot API по методу.
+
+    Регистрируется через bot.session.middleware().
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        method_name = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            telegram_errors_total.inc(method_name, type(e).__name__)
+            raise
+        finally:
+            telegram_request_duration.observe(
+                time.perf_counter() - started, method_name
+            )
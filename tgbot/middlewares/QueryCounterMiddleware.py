@@ -0,0 +1,54 @@
+import logging
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from tgbot.database.instrumentation import QueryLog, current_query_log
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounterMiddleware(BaseMiddleware):
+    """Middleware отладки, считающий SQL-запросы каждого апдейта.
+
+    Логирует апдейты, выполнившие больше max_queries запросов или один
+    и тот же запрос repeat_threshold и более раз - признак N+1 в хендлере.
+    Регистрируется как outer middleware на dp.update только в режиме
+    отладки SQL.
+
+    Args:
+        max_queries: Допустимое количество запросов на апдейт
+        repeat_threshold: С какого количества повторов запрос считается N+1
+    """
+
+    def __init__(self, max_queries: int = 20, repeat_threshold: int = 5) -> None:
+        self.max_queries = max_queries
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        query_log = QueryLog()
+        token = current_query_log.set(query_log)
+        try:
+            return await handler(event, data)
+        finally:
+            current_query_log.reset(token)
+            self._report(event, query_log)
+
+    def _report(self, event: Update, query_log: QueryLog) -> None:
+        repeated = query_log.repeated(self.repeat_threshold)
+        if query_log.total <= self.max_queries and not repeated:
+            return
+
+        lines = [
+            f"[SQL] Апдейт {event.update_id} ({event.event_type}): "
+            f"запросов {query_log.total}, уникальных {len(query_log.statements)}"
+        ]
+        for (method, shape), count in repeated:
+            lines.append(f"  N+1: {count} раз из {method}: {shape[:300]}")
+        logger.warning("\n".join(lines))
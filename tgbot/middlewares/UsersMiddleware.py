@@ -4,7 +4,8 @@ from typing import Any, Awaitable, Callable, Union
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import CallbackQuery, Message, TelegramObject
 from stp_database.models.STP import Employee
-from stp_database.repo.STP import MainRequestsRepo
+
+from tgbot.database import queue_username_update
 
 logger = logging.getLogger(__name__)
 
@@ -21,25 +22,23 @@ class UsersMiddleware(BaseMiddleware):
         event: TelegramObject,
         data: dict[str, Any],
     ) -> Any:
-        # Get user and repos from previous middleware (DatabaseMiddleware)
+        # Get user from previous middleware (DatabaseMiddleware)
         user: Employee = data.get("user")
-        stp_repo: MainRequestsRepo = data.get("stp_repo")
 
         # Update username if needed
-        await self._update_username(user, event, stp_repo)
+        self._update_username(user, event)
 
         return await handler(event, data)
 
     @staticmethod
-    async def _update_username(
+    def _update_username(
         user: Employee,
         event: Union[Message, CallbackQuery],
-        stp_repo: MainRequestsRepo,
     ):
         """Обновление юзернейма пользователя если он отличается от записанного
+        Запись в базу выполняется в фоне пачками, см. flush_username_updates
         :param user:
         :param event:
-        :param stp_repo:
         :return:
         """
         if not user:
@@ -49,23 +48,12 @@ class UsersMiddleware(BaseMiddleware):
         stored_username = user.username
 
         if stored_username != current_username:
-            try:
-                if current_username is None:
-                    await stp_repo.employee.update_user(
-                        user_id=event.from_user.id,
-                        username=None,
-                    )
-                    logger.info(
-                        f"[Юзернейм] Удален юзернейм пользователя {event.from_user.id}"
-                    )
-                else:
-                    await stp_repo.employee.update_user(
-                        user_id=event.from_user.id, username=current_username
-                    )
-                    logger.info(
-                        f"[Юзернейм] Обновлен юзернейм пользователя {event.from_user.id} - @{current_username}"
-                    )
-            except Exception as e:
-                logger.error(
-                    f"[Юзернейм] Ошибка обновления юзернейма для пользователя {event.from_user.id}: {e}"
+            queue_username_update(user, current_username)
+            if current_username is None:
+                logger.info(
+                    f"[Юзернейм] Удален юзернейм пользователя {event.from_user.id}"
+                )
+            else:
+                logger.info(
+                    f"[Юзернейм] Обновлен юзернейм пользователя {event.from_user.id} - @{current_username}"
                 )
@@ -4,13 +4,11 @@ import re
 from aiogram.types import Message
 from stp_database.models.STP import Employee
 
-from tgbot.config import load_config
+from tgbot.config import get_config
 from tgbot.misc.dicts import roles
 
 logger = logging.getLogger(__name__)
 
-config = load_config(".env")
-
 
 async def check_premium_emoji(message: Message) -> tuple[bool, list[str]]:
     emoji_ids = []
@@ -31,16 +29,17 @@ def extract_clever_link(message_text):
 
 
 async def get_target_forum(user: Employee):
+    forum = get_config().forum
     if user.division == "НЦК":
         if user.is_trainee:
-            return config.forum.nck_trainee_forum_id
+            return forum.nck_trainee_forum_id
         else:
-            return config.forum.nck_main_forum_id
+            return forum.nck_main_forum_id
     else:
         if user.is_trainee:
-            return config.forum.ntp_trainee_forum_id
+            return forum.ntp_trainee_forum_id
         else:
-            return config.forum.ntp_main_forum_id
+            return forum.ntp_main_forum_id
 
 
 def get_role(role_id: int = None, role_name: str = None, return_id: bool = False):
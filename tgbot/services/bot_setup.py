@@ -0,0 +1,165 @@
+"""Настройка команд и вебхука бота при запуске.
+
+Вызовы Bot API выполняются только если настройки изменились с прошлого
+запуска: хеш примененных настроек хранится в Redis. Без Redis настройки
+применяются при каждом запуске.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Awaitable, Callable
+
+from aiogram import Bot
+from aiogram.types import (
+    BotCommand,
+    BotCommandScopeAllGroupChats,
+    BotCommandScopeAllPrivateChats,
+)
+from redis.asyncio import Redis
+
+from tgbot.config import Config
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_UPDATES = [
+    "message",
+    "callback_query",
+    "inline_query",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+]
+
+# Команды для приватных чатов
+PRIVATE_COMMANDS = [
+    BotCommand(command="start", description="Главное меню"),
+    BotCommand(command="end", description="Закрыть вопрос"),
+]
+
+# Команды для групповых чатов
+GROUP_COMMANDS = [
+    BotCommand(command="settings", description="Настройки форума"),
+    BotCommand(command="release", description="Освободить вопрос"),
+    BotCommand(command="end", description="Закрыть вопрос"),
+]
+
+STATE_KEY = "questioner:bot_setup:{bot_id}:{name}"
+
+
+def _digest(payload) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+async def _apply_if_changed(
+    bot: Bot,
+    redis: Redis | None,
+    name: str,
+    payload,
+    apply: Callable[[], Awaitable],
+    force: bool = False,
+) -> bool:
+    """Применяет настройку, если ее хеш отличается от сохраненного.
+
+    Args:
+        force: Применить независимо от сохраненного хеша
+
+    Returns:
+        True, если настройка была применена
+    """
+    digest = _digest(payload)
+    key = STATE_KEY.format(bot_id=bot.id, name=name)
+
+    if redis is not None and not force:
+        stored = await redis.get(key)
+        if isinstance(stored, bytes):
+            stored = stored.decode()
+        if stored == digest:
+            logger.info(f"[Запуск] {name}: без изменений, пропускаем")
+            return False
+
+    await apply()
+    if redis is not None:
+        await redis.set(key, digest)
+    return True
+
+
+async def setup_bot_commands(bot: Bot, redis: Redis | None = None) -> None:
+    """Устанавливает команды бота, если они изменились."""
+    commands = {
+        "private": PRIVATE_COMMANDS,
+        "group": GROUP_COMMANDS,
+    }
+    payload = {
+        scope: [command.model_dump() for command in scope_commands]
+        for scope, scope_commands in commands.items()
+    }
+
+    async def apply() -> None:
+        await bot.set_my_commands(
+            commands=PRIVATE_COMMANDS, scope=BotCommandScopeAllPrivateChats()
+        )
+        await bot.set_my_commands(
+            commands=GROUP_COMMANDS, scope=BotCommandScopeAllGroupChats()
+        )
+        logger.info("[Запуск] Команды бота обновлены")
+
+    await _apply_if_changed(bot, redis, "commands", payload, apply)
+
+
+async def setup_webhook(bot: Bot, config: Config, redis: Redis | None = None) -> None:
+    """Устанавливает вебхук, если его настройки изменились.
+
+    Сохраненный хеш сверяется с getWebhookInfo: если вебхук удалили или
+    изменили в обход бота (другой деплой, ручной deleteWebhook, polling
+    с тем же токеном), он устанавливается заново. Накопившиеся за время
+    перезапуска апдейты не сбрасываются и будут доставлены после запуска.
+    """
+    webhook_url = f"https://{config.tg_bot.webhook_domain}{config.tg_bot.webhook_path}"
+    payload = {
+        "url": webhook_url,
+        "allowed_updates": ALLOWED_UPDATES,
+        "secret_token": config.tg_bot.webhook_secret,
+    }
+
+    webhook_info = await bot.get_webhook_info()
+    webhook_outdated = webhook_info.url != webhook_url or sorted(
+        webhook_info.allowed_updates or []
+    ) != sorted(ALLOWED_UPDATES)
+    if webhook_outdated and redis is not None:
+        logger.info("[Вебхук] Текущий вебхук отличается от сохраненного")
+
+    async def apply() -> None:
+        logger.info(f"[Вебхук] Устанавливаем вебхук: {webhook_url}")
+        await bot.set_webhook(
+            url=webhook_url,
+            allowed_updates=ALLOWED_UPDATES,
+            drop_pending_updates=False,
+            secret_token=config.tg_bot.webhook_secret,
+        )
+        logger.info("[Вебхук] Вебхук установлен")
+
+    await _apply_if_changed(
+        bot, redis, "webhook", payload, apply, force=webhook_outdated
+    )
+
+
+async def remove_webhook(bot: Bot, redis: Redis | None = None) -> None:
+    """Удаляет вебхук перед запуском в режиме polling.
+
+    Вебхук удаляется, только если он установлен по данным getWebhookInfo.
+    Накопившиеся апдейты сохраняются.
+    """
+    key = STATE_KEY.format(bot_id=bot.id, name="webhook")
+    webhook_info = await bot.get_webhook_info()
+    if not webhook_info.url:
+        if redis is not None:
+            await redis.delete(key)
+        return
+
+    await bot.delete_webhook(drop_pending_updates=False)
+    if redis is not None:
+        await redis.delete(key)
+    logger.info("[Вебхук] Вебхук удален, бот переходит в режим polling")
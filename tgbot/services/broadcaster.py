@@ -1,26 +1,44 @@
 import asyncio
+import itertools
 import logging
+import time
+import uuid
+from dataclasses import dataclass, field
 from typing import Union
 
 from aiogram import Bot, exceptions
 from aiogram.types import InlineKeyboardMarkup
+from redis.asyncio import Redis
 
+from tgbot.services.request_scheduler import (
+    Priority,
+    TokenBucket,
+    disable_flood_wait_retries,
+    reset_request_priority,
+    restore_flood_wait_retries,
+    set_request_priority,
+)
 
-async def send_message(
+logger = logging.getLogger(__name__)
+
+# Итоговые статусы доставки
+STATUS_SENT = "sent"
+STATUS_BLOCKED = "blocked"
+STATUS_BAD_REQUEST = "bad_request"
+STATUS_FAILED = "failed"
+STATUS_RETRY_LIMIT = "retry_limit"
+
+
+async def _deliver(
     bot: Bot,
     user_id: Union[int, str],
     text: str,
     disable_notification: bool = False,
     reply_markup: InlineKeyboardMarkup | None = None,
-) -> bool:
-    """Безопасная рассылки сообщений
+) -> str:
+    """Отправляет одно сообщение и возвращает статус доставки.
 
-    :param bot: Экземпляр бота.
-    :param user_id: Идентификатор пользователя Telegram. Если строка - должен содержать только цифры.
-    :param text: Текст рассылки.
-    :param disable_notification: Выключить или включить уведомление.
-    :param reply_markup: Клавиатура.
-    :return: Статус успешности.
+    TelegramRetryAfter пробрасывается выше, решение о повторе принимает вызывающий.
     """
     try:
         await bot.send_message(
@@ -29,51 +47,282 @@ async def send_message(
             disable_notification=disable_notification,
             reply_markup=reply_markup,
         )
+    except exceptions.TelegramRetryAfter:
+        raise
     except exceptions.TelegramBadRequest:
-        logging.error("Telegram server says - Bad Request: chat not found")
+        logger.error(f"Target [ID:{user_id}]: Bad Request: chat not found")
+        return STATUS_BAD_REQUEST
     except exceptions.TelegramForbiddenError:
-        logging.error(f"Target [ID:{user_id}]: got TelegramForbiddenError")
-    except exceptions.TelegramRetryAfter as e:
-        logging.error(
-            f"Target [ID:{user_id}]: Flood limit is exceeded. Sleep {e.retry_after} seconds."
-        )
-        await asyncio.sleep(e.retry_after)
-        return await send_message(
-            bot, user_id, text, disable_notification, reply_markup
-        )  # Recursive call
+        logger.error(f"Target [ID:{user_id}]: got TelegramForbiddenError")
+        return STATUS_BLOCKED
     except exceptions.TelegramAPIError:
-        logging.exception(f"Target [ID:{user_id}]: failed")
-    else:
-        logging.info(f"Target [ID:{user_id}]: success")
-        return True
+        logger.exception(f"Target [ID:{user_id}]: failed")
+        return STATUS_FAILED
+    logger.info(f"Target [ID:{user_id}]: success")
+    return STATUS_SENT
+
+
+async def send_message(
+    bot: Bot,
+    user_id: Union[int, str],
+    text: str,
+    disable_notification: bool = False,
+    reply_markup: InlineKeyboardMarkup | None = None,
+    max_attempts: int = 5,
+) -> bool:
+    """Безопасная рассылки сообщений
+
+    :param bot: Экземпляр бота.
+    :param user_id: Идентификатор пользователя Telegram. Если строка - должен содержать только цифры.
+    :param text: Текст рассылки.
+    :param disable_notification: Выключить или включить уведомление.
+    :param reply_markup: Клавиатура.
+    :param max_attempts: Максимальное количество попыток при flood wait.
+    :return: Статус успешности.
+    """
+    for _ in range(max_attempts):
+        try:
+            status = await _deliver(
+                bot, user_id, text, disable_notification, reply_markup
+            )
+        except exceptions.TelegramRetryAfter as e:
+            logger.error(
+                f"Target [ID:{user_id}]: Flood limit is exceeded. Sleep {e.retry_after} seconds."
+            )
+            await asyncio.sleep(e.retry_after)
+        else:
+            return status == STATUS_SENT
     return False
 
 
+@dataclass
+class DeliveryReport:
+    """Отчет о рассылке.
+
+    Attributes:
+        broadcast_id: Идентификатор рассылки
+        statuses: Статус доставки по каждому получателю
+    """
+
+    broadcast_id: str
+    statuses: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def sent_count(self) -> int:
+        return sum(status == STATUS_SENT for status in self.statuses.values())
+
+    def counts(self) -> dict[str, int]:
+        """Количество получателей по статусам."""
+        counts: dict[str, int] = {}
+        for status in self.statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+class Broadcaster:
+    """Рассылка сообщений пулом воркеров с общим ограничением скорости.
+
+    Получатели, упершиеся во flood wait, возвращаются в очередь с задержкой
+    и не блокируют остальных. Если передан клиент Redis, статусы доставки
+    сохраняются по мере отправки, и прерванную рассылку можно продолжить
+    с тем же broadcast_id, не отправляя сообщение повторно.
+
+    Args:
+        bot: Экземпляр бота
+        redis: Клиент Redis для сохранения прогресса
+        workers: Количество параллельных отправок
+        rate: Лимит сообщений в секунду
+        max_attempts: Максимальное количество попыток на получателя
+    """
+
+    PROGRESS_KEY = "questioner:broadcast:{broadcast_id}"
+    PROGRESS_TTL = 7 * 24 * 60 * 60
+
+    def __init__(
+        self,
+        bot: Bot,
+        redis: Redis | None = None,
+        workers: int = 10,
+        rate: float = 30,
+        max_attempts: int = 5,
+    ) -> None:
+        self.bot = bot
+        self.redis = redis
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._bucket = TokenBucket(rate=rate, capacity=rate)
+        self._bucket_lock = asyncio.Lock()
+
+    async def run(
+        self,
+        users: list[Union[str, int]],
+        text: str,
+        disable_notification: bool = False,
+        reply_markup: InlineKeyboardMarkup | None = None,
+        broadcast_id: str | None = None,
+    ) -> DeliveryReport:
+        """Выполняет или продолжает рассылку.
+
+        Args:
+            users: Получатели
+            text: Текст сообщения
+            disable_notification: Отправить без уведомления
+            reply_markup: Клавиатура
+            broadcast_id: Идентификатор прерванной рассылки для продолжения
+
+        Returns:
+            Отчет о доставке по каждому получателю
+        """
+        # Рассылка не должна тормозить пересылку сообщений в диалогах
+        priority_token = set_request_priority(Priority.BACKGROUND)
+        # Flood wait обрабатывается возвратом получателя в очередь,
+        # а не ожиданием внутри воркера
+        retry_token = disable_flood_wait_retries()
+        # run вызывается из задачи хендлера или планировщика, после рассылки
+        # ее запросы должны снова идти со своим приоритетом и повторами
+        try:
+            return await self._broadcast(
+                users, text, disable_notification, reply_markup, broadcast_id
+            )
+        finally:
+            restore_flood_wait_retries(retry_token)
+            reset_request_priority(priority_token)
+
+    async def _broadcast(
+        self,
+        users: list[Union[str, int]],
+        text: str,
+        disable_notification: bool,
+        reply_markup: InlineKeyboardMarkup | None,
+        broadcast_id: str | None,
+    ) -> DeliveryReport:
+        report = DeliveryReport(broadcast_id=broadcast_id or uuid.uuid4().hex)
+        report.statuses.update(await self._load_progress(report.broadcast_id))
+        if report.statuses:
+            logger.info(
+                f"[Рассылка] {report.broadcast_id}: продолжение, уже обработано {len(report.statuses)}"
+            )
+
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        seq = itertools.count()
+        for user_id in dict.fromkeys(str(user_id) for user_id in users):
+            if user_id not in report.statuses:
+                queue.put_nowait((0.0, next(seq), user_id, 1))
+
+        async def worker() -> None:
+            while True:
+                ready_at, _, user_id, attempt = await queue.get()
+                try:
+                    delay = ready_at - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    await self._throttle()
+
+                    try:
+                        status = await _deliver(
+                            self.bot,
+                            int(user_id),
+                            text,
+                            disable_notification,
+                            reply_markup,
+                        )
+                    except exceptions.TelegramRetryAfter as e:
+                        if attempt < self.max_attempts:
+                            logger.warning(
+                                f"[Рассылка] {report.broadcast_id}: flood wait {e.retry_after} сек. для {user_id}, в очередь"
+                            )
+                            queue.put_nowait((
+                                time.monotonic() + e.retry_after,
+                                next(seq),
+                                user_id,
+                                attempt + 1,
+                            ))
+                            continue
+                        status = STATUS_RETRY_LIMIT
+
+                    report.statuses[user_id] = status
+                    await self._save_progress(report.broadcast_id, user_id, status)
+                except Exception as e:
+                    logger.error(f"[Рассылка] Ошибка отправки {user_id}: {e}")
+                    report.statuses[user_id] = STATUS_FAILED
+                    try:
+                        await self._save_progress(
+                            report.broadcast_id, user_id, STATUS_FAILED
+                        )
+                    except Exception as save_error:
+                        logger.error(
+                            f"[Рассылка] Не удалось сохранить прогресс {user_id}: {save_error}"
+                        )
+                finally:
+                    queue.task_done()
+
+        tasks = [asyncio.create_task(worker()) for _ in range(self.workers)]
+        try:
+            await queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(f"[Рассылка] {report.broadcast_id}: завершена, {report.counts()}")
+        return report
+
+    async def _throttle(self) -> None:
+        async with self._bucket_lock:
+            while (delay := self._bucket.delay(time.monotonic())) > 0:
+                await asyncio.sleep(delay)
+            self._bucket.consume()
+
+    async def _load_progress(self, broadcast_id: str) -> dict[str, str]:
+        if not self.redis:
+            return {}
+        progress = await self.redis.hgetall(
+            self.PROGRESS_KEY.format(broadcast_id=broadcast_id)
+        )
+        return {
+            (key.decode() if isinstance(key, bytes) else key): (
+                value.decode() if isinstance(value, bytes) else value
+            )
+            for key, value in progress.items()
+        }
+
+    async def _save_progress(
+        self, broadcast_id: str, user_id: str, status: str
+    ) -> None:
+        if not self.redis:
+            return
+        key = self.PROGRESS_KEY.format(broadcast_id=broadcast_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, user_id, status)
+            pipe.expire(key, self.PROGRESS_TTL)
+            await pipe.execute()
+
+
 async def broadcast(
     bot: Bot,
     users: list[Union[str, int]],
     text: str,
     disable_notification: bool = False,
     reply_markup: InlineKeyboardMarkup | None = None,
-) -> int:
-    """Simple broadcaster.
+    redis: Redis | None = None,
+    broadcast_id: str | None = None,
+) -> DeliveryReport:
+    """Рассылка сообщения списку пользователей.
     :param bot: Bot instance.
     :param users: List of users.
     :param text: Text of the message.
     :param disable_notification: Disable notification or not.
     :param reply_markup: Reply markup.
-    :return: Count of messages.
+    :param redis: Redis client to persist progress.
+    :param broadcast_id: Id of an interrupted broadcast to resume.
+    :return: Delivery report.
     """
-    count = 0
-    try:
-        for user_id in users:
-            if await send_message(
-                bot, user_id, text, disable_notification, reply_markup
-            ):
-                count += 1
-            await asyncio.sleep(
-                0.05
-            )  # 20 messages per second (Limit: 30 messages per second)
-    finally:
-        logging.info(f"{count} messages successful sent.")
-        return count
+    report = await Broadcaster(bot, redis=redis).run(
+        users,
+        text,
+        disable_notification=disable_notification,
+        reply_markup=reply_markup,
+        broadcast_id=broadcast_id,
+    )
+    logger.info(f"{report.sent_count} messages successful sent.")
+    return report
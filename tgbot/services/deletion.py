@@ -0,0 +1,77 @@
+"""Очередь отложенного удаления сообщений."""
+
+import math
+from collections import defaultdict
+
+from redis.asyncio import Redis
+
+# Лимит Bot API на количество сообщений в одном вызове deleteMessages
+DELETE_MESSAGES_LIMIT = 100
+
+
+class MemoryDeletionQueue:
+    """Очередь удаления в памяти процесса.
+
+    Сообщения группируются по чату и секунде, в которую их нужно удалить.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    async def push(self, chat_id: int, message_ids: list[int], due: float) -> None:
+        """Ставит сообщения в очередь на удаление.
+
+        Args:
+            chat_id: Идентификатор чата
+            message_ids: Идентификаторы сообщений
+            due: Время удаления (unix timestamp)
+        """
+        self._buckets[(chat_id, math.ceil(due))].extend(message_ids)
+
+    async def pop_due(self, now: float) -> dict[int, list[int]]:
+        """Забирает из очереди сообщения, которые пора удалить.
+
+        Returns:
+            Идентификаторы сообщений по чатам
+        """
+        due_messages: dict[int, list[int]] = defaultdict(list)
+        for bucket in [bucket for bucket in self._buckets if bucket[1] <= now]:
+            due_messages[bucket[0]].extend(self._buckets.pop(bucket))
+        return due_messages
+
+
+class RedisDeletionQueue:
+    """Очередь удаления в Redis.
+
+    Хранится одним sorted set, где элемент - chat_id:message_id, а вес -
+    секунда удаления. Очередь переживает перезапуск бота.
+    """
+
+    KEY = "questioner:deletions"
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def push(self, chat_id: int, message_ids: list[int], due: float) -> None:
+        await self.redis.zadd(
+            self.KEY,
+            {f"{chat_id}:{message_id}": math.ceil(due) for message_id in message_ids},
+        )
+
+    async def pop_due(self, now: float) -> dict[int, list[int]]:
+        # Чтение и удаление в одной транзакции, чтобы реплики не делили сообщения
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zrangebyscore(self.KEY, "-inf", now)
+            pipe.zremrangebyscore(self.KEY, "-inf", now)
+            members, _ = await pipe.execute()
+
+        due_messages: dict[int, list[int]] = defaultdict(list)
+        for member in members:
+            if isinstance(member, bytes):
+                member = member.decode()
+            chat_id, message_id = member.rsplit(":", 1)
+            due_messages[int(chat_id)].append(int(message_id))
+        return due_messages
+
+
+DeletionQueue = MemoryDeletionQueue | RedisDeletionQueue
@@ -0,0 +1,154 @@
+"""Кеш готовых выгрузок статистики за завершенные месяцы.
+
+Выгрузка за прошедший месяц не меняется, поэтому после первой отправки
+запоминается file_id документа в Telegram. Повторный запрос отправляет
+тот же документ без обращения к базе и без загрузки файла.
+"""
+
+import datetime
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import pytz
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Максимальное количество выгрузок в кеше, лишние вытесняются по давности
+EXPORT_CACHE_SIZE = 100
+
+# Вопросы на границе месяца закрываются позже, поэтому месяц считается
+# завершенным только спустя это время после его окончания
+FINALIZE_DELAY = datetime.timedelta(days=1)
+
+# Границы месяцев считаются по времени вопросов
+TIMEZONE = pytz.timezone("Asia/Yekaterinburg")
+
+
+@dataclass
+class CachedExport:
+    """Отправленная выгрузка.
+
+    Attributes:
+        file_id: Идентификатор документа в Telegram
+        questions_count: Количество вопросов в выгрузке
+    """
+
+    file_id: str
+    questions_count: int
+
+
+class MemoryExportCache:
+    """Кеш выгрузок в памяти процесса."""
+
+    def __init__(self, maxsize: int = EXPORT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._exports: OrderedDict[str, CachedExport] = OrderedDict()
+
+    async def get(self, key: str) -> CachedExport | None:
+        export = self._exports.get(key)
+        if export is not None:
+            self._exports.move_to_end(key)
+        return export
+
+    async def set(self, key: str, export: CachedExport) -> None:
+        self._exports[key] = export
+        self._exports.move_to_end(key)
+        while len(self._exports) > self.maxsize:
+            self._exports.popitem(last=False)
+
+
+class RedisExportCache:
+    """Кеш выгрузок в Redis, общий для всех реплик.
+
+    Выгрузки хранятся в hash, а время последнего обращения - в sorted set,
+    по которому вытесняются давно не запрошенные выгрузки.
+    """
+
+    EXPORTS_KEY = "questioner:export_cache:files"
+    USAGE_KEY = "questioner:export_cache:usage"
+
+    def __init__(self, redis: Redis, maxsize: int = EXPORT_CACHE_SIZE) -> None:
+        self.redis = redis
+        self.maxsize = maxsize
+
+    async def get(self, key: str) -> CachedExport | None:
+        value = await self.redis.hget(self.EXPORTS_KEY, key)
+        if value is None:
+            return None
+        await self.redis.zadd(self.USAGE_KEY, {key: time.time()})
+        return CachedExport(**json.loads(value))
+
+    async def set(self, key: str, export: CachedExport) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.EXPORTS_KEY, key, json.dumps(asdict(export)))
+            pipe.zadd(self.USAGE_KEY, {key: time.time()})
+            pipe.zcard(self.USAGE_KEY)
+            *_, size = await pipe.execute()
+
+        if size <= self.maxsize:
+            return
+
+        stale_keys = await self.redis.zrange(self.USAGE_KEY, 0, size - self.maxsize - 1)
+        if stale_keys:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hdel(self.EXPORTS_KEY, *stale_keys)
+                pipe.zrem(self.USAGE_KEY, *stale_keys)
+                await pipe.execute()
+
+
+_cache: MemoryExportCache | RedisExportCache = MemoryExportCache()
+
+
+def setup_export_cache(redis: Redis) -> None:
+    """Переключает кеш выгрузок на хранение в Redis."""
+    global _cache
+    _cache = RedisExportCache(redis)
+
+
+def _cache_key(year: int, month: int, division: str) -> str:
+    return f"{year}-{month:02d}:{division}"
+
+
+def is_month_finalized(year: int, month: int) -> bool:
+    """Проверяет, что месяц завершен и его выгрузка больше не изменится."""
+    month_end = TIMEZONE.localize(
+        datetime.datetime(year + 1, 1, 1)
+        if month == 12
+        else datetime.datetime(year, month + 1, 1)
+    )
+    return datetime.datetime.now(tz=TIMEZONE) >= month_end + FINALIZE_DELAY
+
+
+async def get_cached_export(
+    year: int, month: int, division: str
+) -> CachedExport | None:
+    """Получает сохраненную выгрузку за завершенный месяц.
+
+    Returns:
+        Выгрузка или None, если месяц не завершен или выгрузки нет в кеше
+    """
+    if not is_month_finalized(year, month):
+        return None
+
+    try:
+        return await _cache.get(_cache_key(year, month, division))
+    except Exception as e:
+        logger.error(f"[Выгрузка] Ошибка чтения кеша выгрузок: {e}")
+        return None
+
+
+async def cache_export(
+    year: int, month: int, division: str, export: CachedExport
+) -> None:
+    """Сохраняет отправленную выгрузку, если месяц уже завершен."""
+    if not is_month_finalized(year, month):
+        return
+
+    try:
+        await _cache.set(_cache_key(year, month, division), export)
+    except Exception as e:
+        logger.error(f"[Выгрузка] Ошибка записи кеша выгрузок: {e}")
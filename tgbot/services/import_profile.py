@@ -0,0 +1,123 @@
+"""Профиль времени импорта и памяти при запуске бота.
+
+Запуск:
+    python -m tgbot.services.import_profile [модуль] [--top N]
+
+Модуль (по умолчанию bot) импортируется в отдельном интерпретаторе
+с -X importtime, поэтому профилирование не влияет на работающий бот.
+Выводятся самые медленные модули, время по пакетам и пиковая память
+процесса после импорта.
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Код, выполняемый в дочернем интерпретаторе: импорт модуля и вывод пиковой памяти
+_IMPORT_CODE = """
+import importlib, resource, sys
+importlib.import_module(sys.argv[1])
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+@dataclass
+class ImportTiming:
+    """Время импорта одного модуля.
+
+    Attributes:
+        module: Полное имя модуля
+        self_us: Собственное время импорта в микросекундах
+        cumulative_us: Время импорта вместе с вложенными модулями
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".", 1)[0]
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Разбирает вывод -X importtime."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Строка заголовка
+            continue
+        timings.append(
+            ImportTiming(
+                module=fields[2].strip(),
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+            )
+        )
+    return timings
+
+
+def profile_import(module: str) -> tuple[list[ImportTiming], int]:
+    """Импортирует модуль в отдельном процессе.
+
+    Returns:
+        Время импорта модулей и пиковая память процесса в КБ
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_CODE, module],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr), int(result.stdout.strip().splitlines()[-1])
+
+
+def format_report(timings: list[ImportTiming], max_rss_kb: int, top: int) -> str:
+    """Формирует текстовый отчет о времени импорта."""
+    total_us = sum(timing.self_us for timing in timings)
+
+    packages: dict[str, int] = defaultdict(int)
+    for timing in timings:
+        packages[timing.package] += timing.self_us
+
+    lines = [
+        f"Модулей загружено: {len(timings)}",
+        f"Общее время импорта: {total_us / 1000:.1f} мс",
+        f"Пиковая память: {max_rss_kb / 1024:.1f} МБ",
+        "",
+        f"Пакеты по времени импорта (топ {top}):",
+    ]
+    for package, self_us in sorted(
+        packages.items(), key=lambda item: item[1], reverse=True
+    )[:top]:
+        lines.append(f"{self_us / 1000:>10.1f} мс  {package}")
+
+    lines += ["", f"Модули по накопленному времени (топ {top}):"]
+    for timing in sorted(timings, key=lambda item: item.cumulative_us, reverse=True)[
+        :top
+    ]:
+        lines.append(f"{timing.cumulative_us / 1000:>10.1f} мс  {timing.module}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Профиль импорта модулей бота")
+    parser.add_argument("module", nargs="?", default="bot")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    try:
+        timings, max_rss_kb = profile_import(args.module)
+    except RuntimeError as e:
+        sys.exit(f"Не удалось импортировать {args.module}: {e}")
+    print(format_report(timings, max_rss_kb, args.top))
+
+
+if __name__ == "__main__":
+    main()
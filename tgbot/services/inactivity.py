@@ -0,0 +1,126 @@
+"""Хранилище последней активности в вопросах для таймеров бездействия."""
+
+import time
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+
+@dataclass
+class IdleQuestion:
+    """Вопрос без активности.
+
+    Attributes:
+        token: Токен вопроса
+        group_id: Идентификатор форума
+        last_activity: Время последней активности (unix timestamp)
+        warned: Отправлено ли предупреждение о бездействии
+    """
+
+    token: str
+    group_id: int
+    last_activity: float
+    warned: bool
+
+
+class MemoryInactivityStore:
+    """Хранилище активности в памяти процесса."""
+
+    def __init__(self) -> None:
+        self._last: dict[str, float] = {}
+        self._groups: dict[str, int] = {}
+        self._warned: set[str] = set()
+
+    async def touch(self, token: str, group_id: int) -> None:
+        """Отмечает активность в вопросе."""
+        self._last[token] = time.time()
+        self._groups[token] = group_id
+        self._warned.discard(token)
+
+    async def remove(self, token: str) -> None:
+        """Прекращает отслеживание вопроса."""
+        self._last.pop(token, None)
+        self._groups.pop(token, None)
+        self._warned.discard(token)
+
+    async def mark_warned(self, token: str) -> None:
+        """Отмечает, что предупреждение о бездействии отправлено."""
+        self._warned.add(token)
+
+    async def get_idle(self, before: float) -> list[IdleQuestion]:
+        """Получает вопросы без активности с момента before."""
+        return [
+            IdleQuestion(
+                token=token,
+                group_id=self._groups[token],
+                last_activity=last_activity,
+                warned=token in self._warned,
+            )
+            for token, last_activity in self._last.items()
+            if last_activity <= before
+        ]
+
+
+class RedisInactivityStore:
+    """Хранилище активности в Redis.
+
+    Время последней активности хранится в sorted set, поэтому отметка
+    активности - одна запись, а поиск просроченных вопросов - один запрос
+    по диапазону.
+    """
+
+    LAST_KEY = "questioner:inactivity:last"
+    GROUPS_KEY = "questioner:inactivity:groups"
+    WARNED_KEY = "questioner:inactivity:warned"
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def touch(self, token: str, group_id: int) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(self.LAST_KEY, {token: time.time()})
+            pipe.hset(self.GROUPS_KEY, token, group_id)
+            pipe.srem(self.WARNED_KEY, token)
+            await pipe.execute()
+
+    async def remove(self, token: str) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.LAST_KEY, token)
+            pipe.hdel(self.GROUPS_KEY, token)
+            pipe.srem(self.WARNED_KEY, token)
+            await pipe.execute()
+
+    async def mark_warned(self, token: str) -> None:
+        await self.redis.sadd(self.WARNED_KEY, token)
+
+    async def get_idle(self, before: float) -> list[IdleQuestion]:
+        entries = await self.redis.zrangebyscore(
+            self.LAST_KEY, "-inf", before, withscores=True
+        )
+        if not entries:
+            return []
+
+        tokens = [_decode(token) for token, _ in entries]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(self.GROUPS_KEY, tokens)
+            pipe.smembers(self.WARNED_KEY)
+            group_ids, warned = await pipe.execute()
+        warned = {_decode(token) for token in warned}
+
+        return [
+            IdleQuestion(
+                token=token,
+                group_id=int(group_id),
+                last_activity=last_activity,
+                warned=token in warned,
+            )
+            for token, (_, last_activity), group_id in zip(tokens, entries, group_ids)
+            if group_id is not None
+        ]
+
+
+InactivityStore = MemoryInactivityStore | RedisInactivityStore
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
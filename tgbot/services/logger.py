@@ -2,6 +2,23 @@ import logging
 
 import betterlogging as bl
 
+# Частые служебные задачи планировщика, запуски которых не пишутся в лог
+QUIET_JOBS = frozenset({"flush_deletion_queue", "flush_username_updates_job"})
+
+
+class QuietJobsFilter(logging.Filter):
+    """Скрывает INFO-записи исполнителя APScheduler о частых задачах.
+
+    Исполнитель передает задачу первым аргументом записи о запуске
+    и завершении, ошибки и предупреждения проходят без изменений.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not record.args:
+            return True
+        job = record.args[0] if isinstance(record.args, tuple) else None
+        return getattr(job, "name", None) not in QUIET_JOBS
+
 
 def setup_logging():
     log_level = logging.INFO
@@ -11,3 +28,6 @@ def setup_logging():
         level=log_level,
         format="%(filename)s:%(lineno)d #%(levelname)-8s [%(asctime)s] - %(name)s - %(message)s",
     )
+
+    # Частые служебные задачи планировщика не засоряют лог каждым запуском
+    logging.getLogger("apscheduler.executors.default").addFilter(QuietJobsFilter())
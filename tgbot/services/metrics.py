@@ -0,0 +1,279 @@
+"""Метрики бота в текстовом формате Prometheus.
+
+Счетчики и гистограммы обновляются middleware и обработчиками событий,
+а значения из существующих stats() собираются в момент запроса /metrics.
+Формат реализован без prometheus_client, чтобы не добавлять зависимость.
+"""
+
+import bisect
+import time
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from aiohttp.web import Request, Response
+
+from tgbot.database.instrumentation import db_checkouts, db_queries
+
+# Границы гистограмм длительности в секундах
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Монотонный счетчик с метками."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self._values[tuple(str(value) for value in label_values)] += amount
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Histogram:
+    """Гистограмма с метками и фиксированными границами."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # Метки -> (количество по корзинам, сумма, количество)
+        self._values: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        key = tuple(str(label) for label in label_values)
+        data = self._values.get(key)
+        if data is None:
+            data = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            data[0][index] += 1
+        data[1] += value
+        data[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        bucket_labels = (*self.labels, "le")
+        for label_values, (bucket_counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(bucket_labels, (*label_values, bound))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(bucket_labels, (*label_values, '+Inf'))} {count}"
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {total!r}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Collector:
+    """Значения, вычисляемые в момент запроса метрик.
+
+    Args:
+        name: Имя метрики
+        documentation: Описание
+        labels: Имена меток
+        collect: Функция, возвращающая пары (значения меток, значение)
+        metric_type: Тип метрики: gauge или counter
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[LabelValues, float]]],
+        metric_type: str = "gauge",
+    ):
+        self.type = metric_type
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for label_values, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+
+class Registry:
+    """Набор метрик, отдаваемых эндпоинтом /metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | Collector] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+updates_total = registry.register(
+    Counter(
+        "questioner_updates_total",
+        "Обработанные апдейты по типу",
+        ("type",),
+    )
+)
+update_duration = registry.register(
+    Histogram(
+        "questioner_update_duration_seconds",
+        "Полное время обработки апдейта",
+        ("type",),
+    )
+)
+handler_calls_total = registry.register(
+    Counter(
+        "questioner_handler_calls_total",
+        "Вызовы хендлеров по роутеру и типу события",
+        ("router", "type", "status"),
+    )
+)
+handler_duration = registry.register(
+    Histogram(
+        "questioner_handler_duration_seconds",
+        "Время работы хендлеров по роутеру и типу события",
+        ("router", "type"),
+    )
+)
+telegram_request_duration = registry.register(
+    Histogram(
+        "questioner_telegram_request_duration_seconds",
+        "Время вызовов Bot API по методу",
+        ("method",),
+    )
+)
+telegram_errors_total = registry.register(
+    Counter(
+        "questioner_telegram_errors_total",
+        "Ошибки вызовов Bot API по методу и типу ошибки",
+        ("method", "error"),
+    )
+)
+job_lag = registry.register(
+    Histogram(
+        "questioner_job_lag_seconds",
+        "Задержка запуска задач планировщика относительно расписания",
+        ("job",),
+        buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 300),
+    )
+)
+job_events_total = registry.register(
+    Counter(
+        "questioner_job_events_total",
+        "Пропущенные и завершившиеся ошибкой запуски задач планировщика",
+        ("job", "event"),
+    )
+)
+
+registry.register(
+    Collector(
+        "questioner_db_checkouts_total",
+        "Выданные пулом соединения с базой",
+        ("db",),
+        lambda: [((db,), count) for db, count in db_checkouts.items()],
+        metric_type="counter",
+    )
+)
+registry.register(
+    Collector(
+        "questioner_db_queries_total",
+        "SQL-запросы по базе и методу репозитория",
+        ("db", "method"),
+        lambda: list(db_queries.items()),
+        metric_type="counter",
+    )
+)
+
+process_start_time = time.time()
+registry.register(
+    Collector(
+        "questioner_process_start_time_seconds",
+        "Время запуска процесса (unix timestamp)",
+        (),
+        lambda: [((), process_start_time)],
+    )
+)
+
+
+def register_stats(
+    name: str,
+    documentation: str,
+    stats: Callable[[], dict],
+    label: str | None = None,
+) -> None:
+    """Публикует результат stats() как набор gauge-метрик.
+
+    Плоский словарь публикуется как метрика с меткой key. Если передан
+    label, stats() возвращает словарь словарей: внешний ключ становится
+    меткой label, внутренний - меткой key.
+    """
+
+    def collect():
+        values = stats()
+        if label is None:
+            return [
+                ((key,), value)
+                for key, value in values.items()
+                if isinstance(value, int | float)
+            ]
+        return [
+            ((outer, key), value)
+            for outer, inner in values.items()
+            for key, value in inner.items()
+            if isinstance(value, int | float)
+        ]
+
+    registry.register(
+        Collector(
+            name, documentation, ("key",) if label is None else (label, "key"), collect
+        )
+    )
+
+
+async def metrics_handler(_request: Request) -> Response:
+    """Эндпоинт /metrics в текстовом формате Prometheus."""
+    return Response(
+        body=registry.render().encode(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
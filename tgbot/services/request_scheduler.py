@@ -0,0 +1,338 @@
+"""Планировщик исходящих запросов к Telegram Bot API.
+
+Запросы, адресованные чатам, проходят через общий token bucket и token
+bucket конкретного чата. Ожидающие запросы выдаются по классу приоритета,
+поэтому пересылка сообщений диалога не стоит в очереди за напоминаниями
+и удалением служебных сообщений.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import DeleteForumTopic, DeleteMessage, DeleteMessages
+from aiogram.methods.base import Response, TelegramMethod, TelegramType
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Класс приоритета запроса. Меньшее значение обслуживается раньше."""
+
+    RELAY = 0
+    NORMAL = 1
+    BACKGROUND = 2
+    CLEANUP = 3
+
+
+CLEANUP_METHODS = (DeleteMessage, DeleteMessages, DeleteForumTopic)
+
+# Префиксы методов, на которые действуют лимиты отправки в чат
+CHAT_LIMITED_PREFIXES = ("send", "edit", "forward", "copy")
+
+_request_priority: ContextVar[Priority | None] = ContextVar(
+    "request_priority", default=None
+)
+
+
+def set_request_priority(priority: Priority) -> Token:
+    """Задает приоритет запросов до конца текущей задачи.
+
+    Апдейты и задачи планировщика обрабатываются в отдельных asyncio задачах,
+    поэтому приоритет не переходит на другие апдейты. Код, который работает
+    в чужой задаче, должен вернуть прежний приоритет через reset.
+
+    Args:
+        priority: Класс приоритета
+
+    Returns:
+        Токен для reset_request_priority
+    """
+    return _request_priority.set(priority)
+
+
+def reset_request_priority(token: Token) -> None:
+    """Возвращает приоритет, действовавший до set_request_priority."""
+    _request_priority.reset(token)
+
+
+_retry_flood_wait: ContextVar[bool] = ContextVar("retry_flood_wait", default=True)
+
+
+def disable_flood_wait_retries() -> Token:
+    """Отключает автоматический повтор запросов после flood wait.
+
+    Действует до конца текущей задачи и в созданных из нее задачах.
+    TelegramRetryAfter пробрасывается сразу, bucket'ы при этом
+    блокируются как обычно. Нужно для вызывающих, которые сами
+    планируют повтор, например рассылки.
+
+    Returns:
+        Токен для restore_flood_wait_retries
+    """
+    return _retry_flood_wait.set(False)
+
+
+def restore_flood_wait_retries(token: Token) -> None:
+    """Возвращает режим повтора, действовавший до disable_flood_wait_retries."""
+    _retry_flood_wait.reset(token)
+
+
+class TokenBucket:
+    """Token bucket с возможностью блокировки на время flood wait.
+
+    Args:
+        rate: Скорость пополнения (запросов в секунду)
+        capacity: Максимальный размер всплеска
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Возвращает время до появления свободного токена в секундах."""
+        self._refill(now)
+        delay = max(self.blocked_until - now, 0.0)
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return delay
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """Блокирует выдачу токенов на указанное время."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+
+def _is_chat_limited(method: TelegramMethod) -> bool:
+    return method.__api_method__.lower().startswith(CHAT_LIMITED_PREFIXES)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: Priority
+    seq: int
+    chat_key: int | str | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class RequestSchedulerMiddleware(BaseRequestMiddleware):
+    """Request middleware сессии бота с ограничением частоты запросов.
+
+    Запросы без chat_id (getMe, answerCallbackQuery и т.п.) не ограничиваются.
+    Лимит чата действует только на отправку и редактирование сообщений,
+    остальные запросы к чату (getChat, getChatMember и т.п.) проходят
+    только через общий лимит. Flood wait от Telegram блокирует bucket
+    чата, а если ожидание дольше интервала чата - и общий bucket, после
+    чего запрос повторяется автоматически.
+
+    Args:
+        global_rate: Общий лимит запросов в секунду
+        private_chat_rate: Лимит запросов в секунду для личного чата
+        group_chat_rate: Лимит запросов в секунду для группы
+        max_retries: Сколько раз повторять запрос после flood wait
+    """
+
+    # Порог неиспользуемых bucket'ов чатов, после которого они удаляются
+    MAX_CHAT_BUCKETS = 10000
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        private_chat_rate: float = 1,
+        group_chat_rate: float = 20 / 60,
+        max_retries: int = 3,
+    ) -> None:
+        self.private_chat_rate = private_chat_rate
+        self.group_chat_rate = group_chat_rate
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chats: dict[int | str, TokenBucket] = {}
+        self._waiting: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+        self.in_flight = 0
+        self.sent = 0
+        self.retry_after_count = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        priority = _request_priority.get()
+        if priority is None:
+            priority = (
+                Priority.CLEANUP
+                if isinstance(method, CLEANUP_METHODS)
+                else Priority.NORMAL
+            )
+
+        # Ключ bucket'а чата, None - только общий лимит
+        chat_key = chat_id if _is_chat_limited(method) else None
+
+        max_retries = self.max_retries if _retry_flood_wait.get() else 0
+
+        attempt = 0
+        while True:
+            await self._acquire(chat_key, priority)
+            self.in_flight += 1
+            try:
+                result = await make_request(bot, method)
+                self.sent += 1
+                return result
+            except TelegramRetryAfter as e:
+                self.retry_after_count += 1
+                self._block(chat_key, e.retry_after)
+                if attempt >= max_retries:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"[Запросы] Flood wait {e.retry_after} сек. для чата {chat_id} "
+                    f"на {method.__api_method__}, повтор {attempt}/{max_retries}"
+                )
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        """Возвращает метрики очереди запросов."""
+        queued = {priority.name.lower(): 0 for priority in Priority}
+        for waiter in self._waiting:
+            if not waiter.future.done():
+                queued[waiter.priority.name.lower()] += 1
+
+        return {
+            "queued": sum(queued.values()),
+            "queued_by_priority": queued,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "retry_after": self.retry_after_count,
+        }
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.MAX_CHAT_BUCKETS:
+                now = time.monotonic()
+                self._chats = {
+                    key: value
+                    for key, value in self._chats.items()
+                    if not value.is_idle(now)
+                }
+
+            # Отрицательные идентификаторы - группы и каналы
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_chat_rate if is_group else self.private_chat_rate
+            bucket = self._chats[chat_id] = TokenBucket(
+                rate=rate, capacity=max(rate, 3)
+            )
+        return bucket
+
+    def _block(self, chat_key: int | str | None, seconds: float) -> None:
+        """Блокирует bucket'ы после flood wait.
+
+        Ожидание дольше интервала между запросами в чат означает лимит
+        на весь бот, поэтому блокируется и общий bucket.
+        """
+        if chat_key is None:
+            self._global.block(seconds)
+            return
+
+        bucket = self._chat_bucket(chat_key)
+        bucket.block(seconds)
+        if seconds > 1 / bucket.rate:
+            self._global.block(seconds)
+
+    def _chat_delay(self, chat_key: int | str | None, now: float) -> float:
+        if chat_key is None:
+            return 0.0
+        return self._chat_bucket(chat_key).delay(now)
+
+    def _consume(self, chat_key: int | str | None) -> None:
+        self._global.consume()
+        if chat_key is not None:
+            self._chat_bucket(chat_key).consume()
+
+    async def _acquire(self, chat_key: int | str | None, priority: Priority) -> None:
+        # Быстрый путь: очередь пуста и лимиты не исчерпаны
+        if not self._waiting:
+            now = time.monotonic()
+            if self._global.delay(now) <= 0 and self._chat_delay(chat_key, now) <= 0:
+                self._consume(chat_key)
+                return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append(_Waiter(priority, next(self._seq), chat_key, future))
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+        await future
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            delay = self._grant()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _grant(self) -> float | None:
+        """Выдает разрешения ожидающим запросам.
+
+        Returns:
+            Время до следующей возможной выдачи или None, если очередь пуста
+        """
+        while True:
+            self._waiting = [w for w in self._waiting if not w.future.done()]
+            if not self._waiting:
+                return None
+
+            now = time.monotonic()
+            global_delay = self._global.delay(now)
+            if global_delay > 0:
+                return global_delay
+
+            next_delay = None
+            for waiter in sorted(self._waiting):
+                delay = self._chat_delay(waiter.chat_key, now)
+                if delay <= 0:
+                    self._consume(waiter.chat_key)
+                    waiter.future.set_result(None)
+                    break
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+            else:
+                return next_delay
@@ -1,59 +1,77 @@
 import datetime
 import logging
+import time
 
 import pytz
 from aiogram import Bot
 from aiogram.types import ReplyKeyboardRemove
+from apscheduler.events import (
+    EVENT_JOB_ADDED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+)
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.jobstores.redis import RedisJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy import Sequence
 from stp_database.models.Questions import MessagesPair, Question
-from stp_database.repo.Questions.requests import QuestionsRequestsRepo
-from stp_database.repo.STP import MainRequestsRepo
 
-from tgbot.config import load_config
+from tgbot.config import Config, get_config
+from tgbot.database import (
+    QuestionerRepo,
+    StpRepo,
+    cache_stats,
+    flush_username_updates,
+)
 from tgbot.keyboards.group.main import closed_question_duty_kb
 from tgbot.keyboards.user.main import (
     question_finish_employee_kb,
 )
 from tgbot.misc.helpers import format_fullname
-
-config = load_config(".env")
-
+from tgbot.services.deletion import (
+    DELETE_MESSAGES_LIMIT,
+    DeletionQueue,
+    MemoryDeletionQueue,
+    RedisDeletionQueue,
+)
+from tgbot.services.inactivity import (
+    InactivityStore,
+    MemoryInactivityStore,
+    RedisInactivityStore,
+)
+from tgbot.services.metrics import job_events_total, job_lag
+from tgbot.services.request_scheduler import (
+    Priority,
+    RequestSchedulerMiddleware,
+    set_request_priority,
+)
+from tgbot.services.update_executor import UpdateExecutor
 
 scheduler = AsyncIOScheduler()
 
-if config.tg_bot.use_redis:
-    job_defaults = {
-        "coalesce": True,
-        "misfire_grace_time": 300,
-        "replace_existing": True,
-    }
+ATTENTION_REMINDERS_JOB_ID = "send_attention_reminders"
 
-    REDIS = {
-        "host": config.redis.redis_host,
-        "port": config.redis.redis_port,
-        "password": config.redis.redis_pass,
-        "db": config.redis.redis_db,
-        "ssl": False,
-        "decode_responses": False,
-    }
 
-    jobstores = {
-        "default": MemoryJobStore(),
-        "redis": RedisJobStore(**REDIS),
-    }
+def setup_scheduler(config: Config) -> None:
+    """Настраивает хранилища задач планировщика.
 
-    scheduler.configure(
-        jobstores=jobstores,
-        job_defaults=job_defaults,
-        timezone=pytz.utc,
-    )
-else:
+    Вызывается при запуске бота, до scheduler.start(), чтобы импорт модуля
+    не читал конфиг и не создавал подключение к Redis.
+    """
     jobstores = {
         "default": MemoryJobStore(),
     }
+    if config.tg_bot.use_redis:
+        jobstores["redis"] = RedisJobStore(
+            host=config.redis.redis_host,
+            port=config.redis.redis_port,
+            password=config.redis.redis_pass,
+            db=config.redis.redis_db,
+            ssl=False,
+            decode_responses=False,
+        )
 
     job_defaults = {
         "coalesce": True,
@@ -66,6 +84,62 @@ else:
         job_defaults=job_defaults,
         timezone=pytz.utc,
     )
+    scheduler.add_listener(_remember_job_name, EVENT_JOB_ADDED)
+    scheduler.add_listener(
+        _record_job_metrics, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED | EVENT_JOB_ERROR
+    )
+
+
+# Префиксы id задач по вопросам: после префикса идет токен вопроса
+JOB_ID_PREFIXES = ("remove_", "attention_reminder_")
+
+# Имена задач для меток метрик: id задачи -> имя функции
+_job_names: dict[str, str] = {}
+
+
+def _job_label(job_id: str) -> str | None:
+    """Метка задачи по вопросу, определяемая по префиксу id."""
+    for prefix in JOB_ID_PREFIXES:
+        if job_id.startswith(prefix):
+            return prefix.rstrip("_")
+    return None
+
+
+def _remember_job_name(event: JobEvent) -> None:
+    """Запоминает имя добавленной задачи для меток метрик.
+
+    Задачи по вопросам размечаются по префиксу id и не запоминаются,
+    остальные задачи живут в памяти, поэтому get_job не ходит в Redis.
+    """
+    if _job_label(event.job_id) is not None or event.jobstore == "redis":
+        return
+    job = scheduler.get_job(event.job_id, event.jobstore)
+    if job is not None:
+        _job_names[event.job_id] = job.name
+
+
+def _record_job_metrics(event: JobEvent) -> None:
+    """Учитывает задержку запуска, пропуски и ошибки задач."""
+    # Метка - имя функции, а не id задачи: id содержат токены вопросов
+    job_name = _job_label(event.job_id) or _job_names.get(event.job_id, "unknown")
+
+    if event.code == EVENT_JOB_SUBMITTED:
+        lag = datetime.datetime.now(tz=pytz.utc) - max(event.scheduled_run_times)
+        job_lag.observe(max(lag.total_seconds(), 0), job_name)
+    elif event.code == EVENT_JOB_MISSED:
+        job_events_total.inc(job_name, "missed")
+    else:
+        job_events_total.inc(job_name, "error")
+
+
+def reschedule_attention_reminders() -> None:
+    """Применяет интервал напоминаний из текущего конфига."""
+    scheduler.reschedule_job(
+        ATTENTION_REMINDERS_JOB_ID,
+        trigger="interval",
+        minutes=get_config().questioner.attention_reminder_minutes,
+    )
+
 
 # TODO ОПТИМИЗИРОВАТЬ
 
@@ -76,47 +150,74 @@ logger = logging.getLogger(__name__)
 
 
 def register_scheduler_dependencies(
-    bot, questioner_session_pool, main_session_pool=None
+    bot, questioner_session_pool, main_session_pool=None, redis=None
 ):
-    """Register bot and session pools for use by scheduled jobs."""
+    """Register bot, session pools and stores for use by scheduled jobs."""
     _scheduler_registry["bot"] = bot
     _scheduler_registry["questioner_session_pool"] = questioner_session_pool
     _scheduler_registry["main_session_pool"] = main_session_pool
+    _scheduler_registry["inactivity_store"] = (
+        RedisInactivityStore(redis) if redis else MemoryInactivityStore()
+    )
+    _scheduler_registry["deletion_queue"] = (
+        RedisDeletionQueue(redis) if redis else MemoryDeletionQueue()
+    )
+
+
+def _deletion_queue() -> DeletionQueue:
+    queue = _scheduler_registry.get("deletion_queue")
+    if queue is None:
+        queue = _scheduler_registry["deletion_queue"] = MemoryDeletionQueue()
+    return queue
 
 
 async def delete_messages(bot: Bot, chat_id: int, message_ids: list[int]):
-    """Удаляет список сообщений."""
-    try:
-        for message_id in message_ids:
-            await bot.delete_message(chat_id=chat_id, message_id=message_id)
-    except Exception as e:
-        logger.error(f"Ошибка при удалении сообщений: {e}")
+    """Удаляет список сообщений пачками через deleteMessages."""
+    for i in range(0, len(message_ids), DELETE_MESSAGES_LIMIT):
+        try:
+            await bot.delete_messages(
+                chat_id=chat_id,
+                message_ids=message_ids[i : i + DELETE_MESSAGES_LIMIT],
+            )
+        except Exception as e:
+            logger.error(f"Ошибка при удалении сообщений: {e}")
 
 
 async def delete_messages_job(chat_id: int, message_ids: list[int]):
-    """Standalone job function to delete messages."""
+    """Standalone job function to delete messages.
+
+    Kept for jobs persisted before the deletion queue.
+    """
+    bot = _scheduler_registry.get("bot")
+    if not bot:
+        logger.error("Bot not registered in scheduler")
+        return
+
+    await delete_messages(bot, chat_id, message_ids)
+
+
+async def flush_deletion_queue():
+    """Удаляет сообщения, срок которых подошел."""
     try:
         bot = _scheduler_registry.get("bot")
         if not bot:
             logger.error("Bot not registered in scheduler")
             return
 
-        for message_id in message_ids:
-            await bot.delete_message(chat_id=chat_id, message_id=message_id)
+        due_messages = await _deletion_queue().pop_due(now=time.time())
+        for chat_id, message_ids in due_messages.items():
+            await delete_messages(bot, chat_id, message_ids)
     except Exception as e:
-        logger.error(f"Ошибка при удалении сообщений: {e}")
+        logger.error(f"Ошибка при удалении сообщений из очереди: {e}")
 
 
 async def run_delete_timer(chat_id: int, message_ids: list[int], seconds: int = 60):
     """Delete messages after timer. Default - 60 seconds."""
     try:
-        scheduler.add_job(
-            delete_messages_job,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.timezone("Asia/Yekaterinburg"))
-            + datetime.timedelta(seconds=seconds),
-            args=[chat_id, message_ids],
-            jobstore="redis" if config.tg_bot.use_redis else "default",
+        await _deletion_queue().push(
+            chat_id=chat_id,
+            message_ids=message_ids,
+            due=time.time() + seconds,
         )
     except Exception as e:
         logger.error(f"Ошибка при планировании удаления сообщений: {e}")
@@ -136,7 +237,7 @@ async def remove_question_timer(question: Question):
                 question.topic_id,
             ],
             id=warning_job_id,
-            jobstore="redis" if config.tg_bot.use_redis else "default",
+            jobstore="redis" if get_config().tg_bot.use_redis else "default",
         )
     except Exception as e:
         logger.error(f"Ошибка при планировании удаления вопроса {question.token}: {e}")
@@ -160,11 +261,10 @@ async def remove_question_job(group_id: int, topic_id: int):
 
 async def remove_old_topics(bot: Bot, session_pool):
     """Remove old topics and questions."""
+    set_request_priority(Priority.CLEANUP)
     try:
         # Create a session and RequestsRepo instance
-        async with session_pool() as session:
-            questions_repo = QuestionsRequestsRepo(session)
-
+        async with QuestionerRepo(session_pool) as questions_repo:
             old_questions: Sequence[
                 Question
             ] = await questions_repo.questions.get_old_questions(days=60)
@@ -209,8 +309,60 @@ async def remove_old_topics(bot: Bot, session_pool):
         logger.error(f"[Старые топики] Общая ошибка при удалении старых данных: {e}")
 
 
+async def flush_username_updates_job():
+    """Standalone job function to write queued username changes."""
+    try:
+        main_session_pool = _scheduler_registry.get("main_session_pool")
+        if not main_session_pool:
+            logger.error("main_session_pool not registered in scheduler")
+            return
+
+        async with main_session_pool() as session:
+            updated = await flush_username_updates(session)
+
+        if updated:
+            logger.info(f"[Юзернейм] Записано изменений юзернеймов: {updated}")
+    except Exception as e:
+        logger.error(f"[Юзернейм] Ошибка записи юзернеймов: {e}")
+
+
+async def log_cache_stats():
+    """Логирует статистику попаданий в кеши репозиториев."""
+    for name, stats in cache_stats().items():
+        requests_count = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / requests_count * 100 if requests_count else 0
+        logger.info(
+            f"[Кеш] {name}: записей {stats['size']}, попаданий {stats['hits']}, "
+            f"промахов {stats['misses']} ({hit_rate:.1f}% попаданий)"
+        )
+
+
+async def log_request_stats(request_scheduler: RequestSchedulerMiddleware):
+    """Логирует состояние очереди исходящих запросов к Telegram."""
+    stats = request_scheduler.stats()
+    queued = ", ".join(
+        f"{name} {count}" for name, count in stats["queued_by_priority"].items()
+    )
+    logger.info(
+        f"[Запросы] В очереди {stats['queued']} ({queued}), в работе {stats['in_flight']}, "
+        f"отправлено {stats['sent']}, flood wait {stats['retry_after']}"
+    )
+
+
+async def log_update_stats(update_executor: UpdateExecutor):
+    """Логирует состояние обработки апдейтов."""
+    stats = update_executor.stats()
+    logger.info(
+        f"[Апдейты] В работе {stats['in_flight']}, в очереди {stats['queued']}, "
+        f"чатов {stats['chats']}, обработано {stats['processed']}"
+    )
+
+
 async def send_inactivity_warning_job(question_token: str):
-    """Standalone function to send inactivity warning."""
+    """Standalone function to send inactivity warning.
+
+    Kept for jobs persisted before the inactivity sweeper.
+    """
     try:
         bot = _scheduler_registry.get("bot")
         questioner_session_pool = _scheduler_registry.get("questioner_session_pool")
@@ -220,8 +372,7 @@ async def send_inactivity_warning_job(question_token: str):
             return
 
         # Create a fresh session for this job
-        async with questioner_session_pool() as session:
-            questions_repo = QuestionsRequestsRepo(session=session)
+        async with QuestionerRepo(questioner_session_pool) as questions_repo:
             await send_inactivity_warning(bot, question_token, questions_repo)
 
     except Exception as e:
@@ -229,7 +380,10 @@ async def send_inactivity_warning_job(question_token: str):
 
 
 async def auto_close_question_job(question_token: str):
-    """Standalone function to auto-close question."""
+    """Standalone function to auto-close question.
+
+    Kept for jobs persisted before the inactivity sweeper.
+    """
     try:
         bot = _scheduler_registry.get("bot")
         questioner_session_pool = _scheduler_registry.get("questioner_session_pool")
@@ -239,8 +393,7 @@ async def auto_close_question_job(question_token: str):
             return
 
         # Create a fresh session for this job
-        async with questioner_session_pool() as session:
-            questions_repo = QuestionsRequestsRepo(session=session)
+        async with QuestionerRepo(questioner_session_pool) as questions_repo:
             await auto_close_question(bot, question_token, questions_repo)
 
     except Exception as e:
@@ -248,7 +401,7 @@ async def auto_close_question_job(question_token: str):
 
 
 async def send_inactivity_warning(
-    bot: Bot, question_token: str, questions_repo: QuestionsRequestsRepo
+    bot: Bot, question_token: str, questions_repo: QuestionerRepo
 ):
     """Отправляет предупреждение о бездействии через 5 минут."""
     try:
@@ -285,7 +438,7 @@ async def send_inactivity_warning(
 
 
 async def auto_close_question(
-    bot: Bot, question_token: str, questions_repo: QuestionsRequestsRepo
+    bot: Bot, question_token: str, questions_repo: QuestionerRepo
 ):
     """Автоматически закрывает вопрос через 10 минут бездействия."""
     try:
@@ -346,67 +499,39 @@ async def auto_close_question(
         )
 
 
-async def start_inactivity_timer(question_token: str, questions_repo):
-    """Запускает таймер бездействия для вопроса."""
-    try:
-        # Проверяем, нужно ли запускать таймер для этого вопроса
-        question = await questions_repo.questions.get_question(token=question_token)
+def _inactivity_store() -> InactivityStore:
+    store = _scheduler_registry.get("inactivity_store")
+    if store is None:
+        store = _scheduler_registry["inactivity_store"] = MemoryInactivityStore()
+    return store
 
-        if not question:
-            return
 
-        group_settings = await questions_repo.settings.get_settings_by_group_id(
-            group_id=question.group_id,
-        )
+async def _is_activity_tracked(question: Question, questions_repo) -> bool:
+    """Проверяет, нужно ли отслеживать бездействие в вопросе."""
+    # Таймер бездействия работает только для вопросов с назначенным дежурным
+    if question.status not in ["open", "in_progress"] or not question.duty_userid:
+        return False
 
-        if not group_settings:
-            return
+    if question.activity_status_enabled is not None:
+        return bool(question.activity_status_enabled)
 
-        # Проверяем, что у вопроса есть назначенный дежурный
-        if not question.duty_userid:
-            # Если дежурный не назначен, не запускаем таймер бездействия
-            return
+    group_settings = await questions_repo.settings.get_settings_by_group_id(
+        group_id=question.group_id,
+    )
+    if not group_settings:
+        return False
+    return bool(group_settings.get_setting("activity_status"))
 
-        # Определяем эффективный статус активности
-        activity_enabled = (
-            question.activity_status_enabled
-            if question.activity_status_enabled is not None
-            else group_settings.get_setting("activity_status")
-        )
-        if not activity_enabled:
-            # Если активность отключена для этого топика, не запускаем таймер
-            return
 
-        # Удаляем существующие задачи для этого вопроса
-        stop_inactivity_timer(question_token)
+async def start_inactivity_timer(question_token: str, questions_repo):
+    """Запускает таймер бездействия для вопроса."""
+    try:
+        question = await questions_repo.questions.get_question(token=question_token)
 
-        # Запускаем таймер предупреждения
-        warning_job_id = f"warning_{question_token}"
-        scheduler.add_job(
-            send_inactivity_warning_job,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.timezone("Asia/Yekaterinburg"))
-            + datetime.timedelta(
-                minutes=int(group_settings.get_setting("activity_warn_minutes"))
-            ),
-            args=[question_token],
-            id=warning_job_id,
-            jobstore="redis" if config.tg_bot.use_redis else "default",
-        )
+        if not question:
+            return
 
-        # Запускаем таймер автозакрытия
-        close_job_id = f"close_{question_token}"
-        scheduler.add_job(
-            auto_close_question_job,
-            "date",
-            run_date=datetime.datetime.now(tz=pytz.timezone("Asia/Yekaterinburg"))
-            + datetime.timedelta(
-                minutes=int(group_settings.get_setting("activity_close_minutes"))
-            ),
-            args=[question_token],
-            id=close_job_id,
-            jobstore="redis" if config.tg_bot.use_redis else "default",
-        )
+        await restart_inactivity_timer(question, questions_repo)
 
     except Exception as e:
         logger.error(
@@ -414,172 +539,229 @@ async def start_inactivity_timer(question_token: str, questions_repo):
         )
 
 
-def stop_inactivity_timer(question_token: str):
+async def stop_inactivity_timer(question_token: str):
     """Останавливает таймер бездействия для вопроса."""
     try:
-        warning_job_id = f"warning_{question_token}"
-        close_job_id = f"close_{question_token}"
-
-        # Удаляем задачи, если они существуют
-        try:
-            scheduler.remove_job(
-                warning_job_id,
-                jobstore="redis" if config.tg_bot.use_redis else "default",
-            )
-        except Exception as e:
-            logger.debug(f"[Задачи] Ошибка при удалении задачи {warning_job_id}: {e}")
-
-        try:
-            scheduler.remove_job(
-                close_job_id, jobstore="redis" if config.tg_bot.use_redis else "default"
-            )
-        except Exception as e:
-            logger.debug(f"[Задачи] Ошибка при удалении задачи {close_job_id}: {e}")
-
+        await _inactivity_store().remove(question_token)
     except Exception as e:
         logger.error(
             f"[Таймер бездействия] Ошибка при остановке таймера для вопроса {question_token}: {e}"
         )
 
 
-async def restart_inactivity_timer(question_token: str, questions_repo):
-    """Перезапускает таймер бездействия для вопроса."""
-    try:
-        # Останавливаем существующий таймер
-        stop_inactivity_timer(question_token)
+async def restart_inactivity_timer(question: Question, questions_repo):
+    """Перезапускает таймер бездействия для вопроса.
 
-        # Запускаем новый таймер
-        await start_inactivity_timer(question_token, questions_repo)
+    Только отмечает время последней активности, предупреждения
+    и автозакрытие выполняет sweep_inactive_questions.
+    """
+    try:
+        if await _is_activity_tracked(question, questions_repo):
+            await _inactivity_store().touch(question.token, question.group_id)
+        else:
+            await _inactivity_store().remove(question.token)
 
     except Exception as e:
         logger.error(
-            f"[Таймер бездействия] Ошибка при перезапуске таймера для вопроса {question_token}: {e}"
+            f"[Таймер бездействия] Ошибка при перезапуске таймера для вопроса {question.token}: {e}"
         )
 
 
-async def send_attention_reminder_job(question_token: str):
-    """Standalone function to send attention reminder to general chat."""
+async def sweep_inactive_questions():
+    """Отправляет предупреждения и закрывает вопросы без активности."""
+    set_request_priority(Priority.BACKGROUND)
     try:
         bot = _scheduler_registry.get("bot")
         questioner_session_pool = _scheduler_registry.get("questioner_session_pool")
-        main_session_pool = _scheduler_registry.get("main_session_pool")
 
         if not bot or not questioner_session_pool:
             logger.error("Bot or questioner_session_pool not registered in scheduler")
             return
 
-        if not main_session_pool:
-            logger.error("main_session_pool not registered in scheduler")
+        store = _inactivity_store()
+        now = time.time()
+        idle_questions = await store.get_idle(before=now - 60)
+        if not idle_questions:
             return
 
-        # Create a fresh session for this job
-        async with questioner_session_pool() as questioner_session:
-            async with main_session_pool() as main_session:
-                questions_repo = QuestionsRequestsRepo(session=questioner_session)
-                stp_repo = MainRequestsRepo(session=main_session)
-                await send_attention_reminder(
-                    bot, question_token, questions_repo, stp_repo
+        async with QuestionerRepo(questioner_session_pool) as questions_repo:
+            for idle in idle_questions:
+                group_settings = await questions_repo.settings.get_settings_by_group_id(
+                    group_id=idle.group_id,
                 )
+                if not group_settings:
+                    await store.remove(idle.token)
+                    continue
+
+                idle_minutes = (now - idle.last_activity) / 60
+                if idle_minutes >= int(
+                    group_settings.get_setting("activity_close_minutes")
+                ):
+                    await store.remove(idle.token)
+                    await auto_close_question(bot, idle.token, questions_repo)
+                elif not idle.warned and idle_minutes >= int(
+                    group_settings.get_setting("activity_warn_minutes")
+                ):
+                    await store.mark_warned(idle.token)
+                    await send_inactivity_warning(bot, idle.token, questions_repo)
 
     except Exception as e:
-        logger.error(f"Error in attention reminder job for {question_token}: {e}")
+        logger.error(f"[Таймер бездействия] Ошибка при проверке бездействия: {e}")
+
+
+async def send_attention_reminder_job(question_token: str):
+    """Standalone function left for attention jobs persisted before the sweeper.
+
+    Removes its own job, reminders are sent by send_attention_reminders.
+    """
+    stop_attention_reminder(question_token)
+
+
+def _question_link(question: Question) -> str:
+    return f"https://t.me/c/{str(question.group_id)[4:]}/{question.topic_id}"
 
 
 async def send_attention_reminder(
     bot: Bot,
-    question_token: str,
-    questions_repo: QuestionsRequestsRepo,
-    stp_repo: MainRequestsRepo,
+    question: Question,
+    stp_repo: StpRepo,
+    wait_minutes: int,
 ):
     """Отправляет напоминание о вопросе, требующем внимания, в общий чат группы."""
-    try:
-        question = await questions_repo.questions.get_question(token=question_token)
+    employee = await stp_repo.employee.get_users(user_id=question.employee_userid)
 
-        if not question:
-            logger.warning(
-                f"[Внимание вопросу] Вопрос {question_token} не найден в базе для напоминания"
-            )
-            stop_attention_reminder(question_token)
-            return
+    if not employee:
+        logger.warning(
+            "[Внимание вопросу] Не удалось напомнить о вопросе: Не нашли специалиста"
+        )
+        return
 
-        employee = await stp_repo.employee.get_users(user_id=question.employee_userid)
+    # Отправка уведомления в главную тему
+    reminder_text = f"""🔔 <b>Вопрос требует внимания!</b>
 
-        if not employee:
-            logger.warning(
-                "[Внимание вопросу] Не удалось напомнить о вопросе: Не нашли специалиста"
-            )
-            return
+<b>От:</b> {format_fullname(employee, True, True)}
+<b>Создан в:</b> {question.start_time.strftime("%H:%M")} ПРМ
 
-        # Проверка, что вопрос все еще открыт и не имеет дежурного
-        if question.status != "open" or question.duty_userid:
-            logger.info(
-                f"[Внимание вопросу] Вопрос {question_token} уже имеет дежурного или закрыт, пропускаем напоминание"
-            )
-            stop_attention_reminder(question_token=question.token)
-            return
+Вопрос ожидает дежурного больше {wait_minutes} минут!
 
-        # Отправка уведомления в главную тему
-        reminder_text = f"""🔔 <b>Вопрос требует внимания!</b>
+<a href="{_question_link(question)}">Перейти к вопросу</a>"""
 
-<b>От:</b> {format_fullname(employee, True, True)}
-<b>Создан в:</b> {question.start_time.strftime("%H:%M")} ПРМ
+    await bot.send_message(
+        chat_id=question.group_id,
+        text=reminder_text,
+        disable_web_page_preview=True,
+    )
 
-Вопрос ожидает дежурного уже 5 минут!
+    logger.info(
+        f"[Внимание вопросу] Напоминание отправлено по вопросу {question.token}"
+    )
 
-<a href="https://t.me/c/{str(question.group_id)[4:]}/{question.topic_id}">Перейти к вопросу</a>"""
 
+async def send_attention_digest(
+    bot: Bot,
+    group_id: int,
+    questions: list[Question],
+    stp_repo: StpRepo,
+    wait_minutes: int,
+):
+    """Отправляет в общий чат группы одну сводку по всем вопросам без дежурного."""
+    employees = await stp_repo.employee.get_users_by_ids(
+        question.employee_userid for question in questions
+    )
+
+    lines = []
+    for question in questions:
+        employee = employees.get(question.employee_userid)
+        employee_name = (
+            format_fullname(employee, True, True) if employee else "Специалист"
+        )
+        lines.append(
+            f"• {employee_name}, {question.start_time.strftime('%H:%M')} ПРМ — "
+            f'<a href="{_question_link(question)}">перейти</a>'
+        )
+
+    header = f"""🔔 <b>Вопросы требуют внимания!</b>
+
+Ожидают дежурного больше {wait_minutes} минут: <b>{len(questions)}</b>
+"""
+
+    # Разбиваем сводку, чтобы не превысить лимит длины сообщения
+    chunks = [header]
+    for line in lines:
+        if len(chunks[-1]) + len(line) + 1 > 4000:
+            chunks.append("")
+        chunks[-1] += f"\n{line}"
+
+    for chunk in chunks:
         await bot.send_message(
-            chat_id=question.group_id,
-            text=reminder_text,
+            chat_id=group_id,
+            text=chunk,
             disable_web_page_preview=True,
         )
 
-        logger.info(
-            f"[Внимание вопросу] Напоминание отправлено по вопросу {question_token}"
-        )
+    logger.info(
+        f"[Внимание вопросу] Сводка по {len(questions)} вопросам отправлена в форум {group_id}"
+    )
 
-    except Exception as e:
-        logger.error(
-            f"[Внимание вопросу] Ошибка при отправке напоминания для вопроса {question_token}: {e}"
-        )
 
+async def send_attention_reminders():
+    """Напоминает о всех открытых вопросах, слишком долго ожидающих дежурного.
 
-async def start_attention_reminder(question_token: str, questions_repo):
-    """Запускает таймер напоминаний о внимании для нового вопроса."""
+    Один запрос на проход вместо отдельной задачи на каждый вопрос.
+    """
+    set_request_priority(Priority.BACKGROUND)
     try:
-        question = await questions_repo.questions.get_question(token=question_token)
-        if not question:
-            stop_attention_reminder(question.token)
+        bot = _scheduler_registry.get("bot")
+        questioner_session_pool = _scheduler_registry.get("questioner_session_pool")
+        main_session_pool = _scheduler_registry.get("main_session_pool")
+
+        if not bot or not questioner_session_pool:
+            logger.error("Bot or questioner_session_pool not registered in scheduler")
             return
 
-        # Проверка, что вопрос все еще открыт и не имеет дежурного
-        if question.status != "open" or question.duty_userid:
-            stop_attention_reminder(question.token)
+        if not main_session_pool:
+            logger.error("main_session_pool not registered in scheduler")
             return
 
-        # Останавливаем все активные напоминания для этого вопроса
-        stop_attention_reminder(question_token)
+        questioner_config = get_config().questioner
+        wait_minutes = questioner_config.attention_reminder_minutes
+        started_before = datetime.datetime.now(
+            tz=pytz.timezone("Asia/Yekaterinburg")
+        ) - datetime.timedelta(minutes=wait_minutes)
+
+        async with (
+            QuestionerRepo(questioner_session_pool) as questions_repo,
+            StpRepo(main_session_pool) as stp_repo,
+        ):
+            questions = await questions_repo.questions.get_unassigned_questions(
+                started_before=started_before
+            )
+            # Репозиторий вопросов больше не нужен, отпускаем соединение
+            await questions_repo.close()
 
-        # Запускаем рекуррентную задачу для проверки каждые 5 минут
-        attention_job_id = f"attention_reminder_{question_token}"
-        scheduler.add_job(
-            send_attention_reminder_job,
-            "interval",
-            minutes=5,
-            start_date=datetime.datetime.now(tz=pytz.timezone("Asia/Yekaterinburg"))
-            + datetime.timedelta(minutes=5),
-            args=[question_token],
-            id=attention_job_id,
-            jobstore="redis" if config.tg_bot.use_redis else "default",
-        )
+            forums: dict[int, list[Question]] = {}
+            for question in questions:
+                forums.setdefault(question.group_id, []).append(question)
 
-        logger.info(
-            f"[Внимание вопросу] Отслеживание дежурного включено для вопроса {question_token}"
-        )
+            for group_id, forum_questions in forums.items():
+                try:
+                    if questioner_config.attention_digest and len(forum_questions) > 1:
+                        await send_attention_digest(
+                            bot, group_id, forum_questions, stp_repo, wait_minutes
+                        )
+                    else:
+                        for question in forum_questions:
+                            await send_attention_reminder(
+                                bot, question, stp_repo, wait_minutes
+                            )
+                except Exception as e:
+                    logger.error(
+                        f"[Внимание вопросу] Ошибка при отправке напоминаний в форум {group_id}: {e}"
+                    )
 
     except Exception as e:
         logger.error(
-            f"[Внимание вопросу] Ошибка при запуске отслеживания дежурного для вопроса {question_token}: {e}"
+            f"[Внимание вопросу] Ошибка при проверке вопросов без дежурного: {e}"
         )
 
 
@@ -592,7 +774,7 @@ def stop_attention_reminder(question_token: str):
         try:
             scheduler.remove_job(
                 attention_job_id,
-                jobstore="redis" if config.tg_bot.use_redis else "default",
+                jobstore="redis" if get_config().tg_bot.use_redis else "default",
             )
             logger.info(
                 f"[Внимание вопросу] Отслеживание выключено для вопроса {question_token}"
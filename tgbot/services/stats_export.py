@@ -0,0 +1,252 @@
+"""Формирование файлов выгрузки статистики в отдельном процессе.
+
+Воркер запускается как python -m tgbot.services.stats_export, поэтому
+в нем загружается только этот модуль, без bot.py, aiogram и базы.
+Модуль не должен тянуть конфиг, базу и aiogram на уровне модуля.
+
+Строки выгрузки не держатся в памяти целиком: обработчик дописывает их
+пачками во временный файл, а воркер читает его пачками и пишет XLSX
+или CSV сразу на диск. Если файл не помещается в лимит загрузки
+Telegram, выгрузка делится на несколько файлов.
+"""
+
+import asyncio
+import csv
+import datetime
+import json
+import math
+import os
+import pickle
+import sys
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+EXPORT_COLUMNS = (
+    "Токен",
+    "Дежурный",
+    "Специалист",
+    "Направление",
+    "Вопрос",
+    "Время вопроса",
+    "Время завершения",
+    "Ссылка на БЗ",
+    "Оценка специалиста",
+    "Оценка дежурного",
+    "Статус чата",
+    "Возврат",
+)
+
+EXPORT_FORMATS = ("xlsx", "csv")
+
+# Лимит Telegram на загрузку файла ботом - 50 МБ, оставляем запас
+MAX_EXPORT_FILE_SIZE = 45 * 1024 * 1024
+
+# Корень проекта, из которого запускается воркер
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Выгрузки собираются по одной: память контейнера ограничена
+_export_lock = asyncio.Lock()
+
+# Запущенные процессы-воркеры, завершаются при остановке бота
+_workers: set[asyncio.subprocess.Process] = set()
+
+
+class ExportRowsFile:
+    """Временный файл со строками выгрузки, записываемый пачками.
+
+    Используется как контекстный менеджер, файл удаляется при выходе.
+    """
+
+    def __init__(self) -> None:
+        fd, self.path = tempfile.mkstemp(prefix="export_", suffix=".rows")
+        self._file = os.fdopen(fd, "wb")
+        self.count = 0
+
+    def write(self, rows: list[tuple]) -> None:
+        """Дописывает пачку строк в файл."""
+        if rows:
+            pickle.dump(rows, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.count += len(rows)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "ExportRowsFile":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+        remove_file(self.path)
+
+
+def iter_rows_file(path: str):
+    """Читает пачки строк из файла, записанного ExportRowsFile."""
+    with open(path, "rb") as rows_file:
+        while True:
+            try:
+                yield pickle.load(rows_file)
+            except EOFError:
+                return
+
+
+def _iter_rows(path: str, start: int, stop: int) -> Iterator[tuple]:
+    """Читает строки с номерами [start, stop) из файла строк."""
+    rows = (row for chunk in iter_rows_file(path) for row in chunk)
+    return islice(rows, start, stop)
+
+
+def _naive(value):
+    # Excel не хранит часовой пояс
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _write_xlsx(rows: Iterable[tuple], sheet_name: str, path: str) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_name)
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append([_naive(value) for value in row])
+    workbook.save(path)
+
+
+def _write_csv(rows: Iterable[tuple], _sheet_name: str, path: str) -> None:
+    # utf-8-sig, чтобы Excel правильно открывал кириллицу
+    with open(path, "w", encoding="utf-8-sig", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(rows)
+
+
+_WRITERS: dict[str, Callable[[Iterable[tuple], str, str], None]] = {
+    "xlsx": _write_xlsx,
+    "csv": _write_csv,
+}
+
+
+def _write_part(export_format: str, rows: Iterable[tuple], sheet_name: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=f".{export_format}")
+    os.close(fd)
+    try:
+        _WRITERS[export_format](rows, sheet_name, path)
+    except Exception:
+        remove_file(path)
+        raise
+    return path
+
+
+def build_export_files(
+    rows_path: str,
+    sheet_name: str,
+    export_format: str = "xlsx",
+    max_file_size: int = MAX_EXPORT_FILE_SIZE,
+) -> list[str]:
+    """Собирает файлы выгрузки из строк, записанных ExportRowsFile.
+
+    Размер сжатого файла заранее неизвестен, поэтому если самый большой
+    файл превысил max_file_size, выгрузка пересобирается на большее
+    количество частей.
+
+    Args:
+        rows_path: Путь к файлу строк
+        sheet_name: Название листа XLSX
+        export_format: Формат файла из EXPORT_FORMATS
+        max_file_size: Максимальный размер одного файла в байтах
+
+    Returns:
+        Пути к временным файлам по порядку, удалять их должен вызывающий
+    """
+    if export_format not in _WRITERS:
+        raise ValueError(f"Неизвестный формат выгрузки: {export_format}")
+
+    total = sum(len(chunk) for chunk in iter_rows_file(rows_path))
+    parts = 1
+    while True:
+        part_size = max(math.ceil(total / parts), 1)
+        paths = []
+        try:
+            for start in range(0, max(total, 1), part_size):
+                paths.append(
+                    _write_part(
+                        export_format,
+                        _iter_rows(rows_path, start, start + part_size),
+                        sheet_name,
+                    )
+                )
+        except Exception:
+            for path in paths:
+                remove_file(path)
+            raise
+
+        largest = max(os.path.getsize(path) for path in paths)
+        if largest <= max_file_size or part_size == 1:
+            return paths
+
+        for path in paths:
+            remove_file(path)
+        parts = max(parts + 1, math.ceil(parts * largest / max_file_size * 1.1))
+
+
+async def build_export_in_process(
+    rows_path: str, sheet_name: str, export_format: str = "xlsx"
+) -> list[str]:
+    """Собирает файлы выгрузки в отдельном процессе, не блокируя event loop.
+
+    Воркер запускается через python -m и получает только аргументы
+    выгрузки, пути к файлам возвращает в stdout в виде JSON.
+    """
+    async with _export_lock:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            __name__,
+            rows_path,
+            sheet_name,
+            export_format,
+            cwd=PROJECT_ROOT,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _workers.add(process)
+        try:
+            stdout, stderr = await process.communicate()
+        finally:
+            _workers.discard(process)
+
+    if process.returncode != 0:
+        lines = stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(
+            lines[-1] if lines else f"Воркер завершился с кодом {process.returncode}"
+        )
+    return json.loads(stdout)
+
+
+def remove_file(path: str) -> None:
+    """Удаляет временный файл, если он существует."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def shutdown_export_workers() -> None:
+    """Завершает запущенные процессы выгрузки."""
+    for process in list(_workers):
+        if process.returncode is None:
+            process.kill()
+
+
+def main() -> None:
+    rows_path, sheet_name, export_format = sys.argv[1:4]
+    paths = build_export_files(rows_path, sheet_name, export_format)
+    print(json.dumps(paths))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Параллельная обработка апдейтов с сохранением порядка внутри чата."""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Hashable
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import CallbackQuery, Update
+
+logger = logging.getLogger(__name__)
+
+
+def get_update_key(update: Update) -> Hashable | None:
+    """Возвращает ключ очереди апдейта: чат и топик форума.
+
+    Апдейты с одинаковым ключом обрабатываются строго по порядку.
+    """
+    try:
+        event = update.event
+    except Exception:
+        return None
+
+    message = event.message if isinstance(event, CallbackQuery) else event
+    chat = getattr(message, "chat", None)
+    if chat is not None:
+        thread_id = (
+            getattr(message, "message_thread_id", None)
+            if getattr(message, "is_topic_message", None)
+            else None
+        )
+        return chat.id, thread_id
+
+    from_user = getattr(event, "from_user", None)
+    if from_user is not None:
+        return from_user.id, None
+    return None
+
+
+class UpdateExecutor:
+    """Ограничивает параллельную обработку апдейтов.
+
+    Апдейты разных чатов обрабатываются параллельно, но не больше
+    max_concurrent одновременно. Апдейты одного чата или топика форума
+    выполняются по очереди в порядке поступления, поэтому пересылаемые
+    сообщения не меняются местами.
+
+    Подключается через setup(dp) и оборачивает Dispatcher.feed_update -
+    общую точку входа апдейтов в режимах polling и webhook. Замок чата
+    берется раньше всех outer middleware диспетчера, в том числе
+    FSMContextMiddleware, который обращается к хранилищу состояний.
+    """
+
+    def __init__(self, max_concurrent: int = 16) -> None:
+        self.max_concurrent = max_concurrent
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._chat_locks: dict[Hashable, asyncio.Lock] = {}
+        self._chat_waiters: dict[Hashable, int] = {}
+
+        self.in_flight = 0
+        self.queued = 0
+        self.processed = 0
+
+    def setup(self, dispatcher: Dispatcher) -> None:
+        """Оборачивает feed_update диспетчера."""
+        feed_update = dispatcher.feed_update
+
+        @functools.wraps(feed_update)
+        async def wrapper(bot: Bot, update: Update, **kwargs: Any) -> Any:
+            return await self.run(feed_update, bot, update, **kwargs)
+
+        dispatcher.feed_update = wrapper
+
+    async def run(
+        self,
+        feed_update: Callable[..., Awaitable[Any]],
+        bot: Bot,
+        update: Update,
+        **kwargs: Any,
+    ) -> Any:
+        """Обрабатывает апдейт в очереди его чата."""
+        key = get_update_key(update)
+
+        # Замок чата берется синхронно, до первого await, чтобы сохранить
+        # порядок поступления апдейтов
+        lock = None
+        if key is not None:
+            lock = self._chat_locks.get(key)
+            if lock is None:
+                lock = self._chat_locks[key] = asyncio.Lock()
+            self._chat_waiters[key] = self._chat_waiters.get(key, 0) + 1
+
+        started = False
+        self.queued += 1
+        try:
+            if lock is not None:
+                await lock.acquire()
+            try:
+                async with self._semaphore:
+                    started = True
+                    self.queued -= 1
+                    self.in_flight += 1
+                    try:
+                        return await feed_update(bot, update, **kwargs)
+                    finally:
+                        self.in_flight -= 1
+                        self.processed += 1
+            finally:
+                if lock is not None:
+                    lock.release()
+        finally:
+            # Апдейт отменен до начала обработки
+            if not started:
+                self.queued -= 1
+
+            if key is not None:
+                self._chat_waiters[key] -= 1
+                if not self._chat_waiters[key]:
+                    del self._chat_waiters[key]
+                    del self._chat_locks[key]
+
+    def stats(self) -> dict:
+        """Возвращает метрики обработки апдейтов."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "chats": len(self._chat_locks),
+            "processed": self.processed,
+        }